@@ -0,0 +1,250 @@
+# Headless API over the dashboard's loaders: the datasets of every case study as JSON or Arrow IPC, with ETags
+# derived from the data version so clients and proxies can revalidate with If-None-Match and get 304s.
+#
+#   python phonepe_api.py [--host 127.0.0.1] [--port 8600]
+#
+#   GET /v1/health
+#   GET /v1/filters                            years, quarters and states to filter on
+#   GET /v1/cases                              case studies, their slugs and dataset names
+#   GET /v1/cases/<slug>?years=2023,2024&quarters=1,2&states=Goa,Kerala&state=Goa
+#   GET /v1/cases/<slug>/<dataset>[?format=arrow]   one dataset; "cat.1" is the second frame of a two-frame dataset
+#   GET /metrics                               Prometheus text of this process
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pyarrow as pa
+
+from phonepe_db import FETCH_WORKERS
+from phonepe_fetch import fetch_all
+from phonepe_loaders import data_version, load_years_quarters
+from phonepe_metrics import CASE, REGISTRY, in_context
+from phonepe_pages import CASE_STUDIES, PAGE_PLANS, page_plan
+from phonepe_states import INDIA_STATES
+
+API_HOST = os.environ.get("PHONEPE_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("PHONEPE_API_PORT", "8600"))
+# Seconds a client or proxy may reuse a response before revalidating it
+API_MAX_AGE = int(os.environ.get("PHONEPE_API_MAX_AGE", "60"))
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+logger = logging.getLogger("phonepe.api")
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+def available_filters() -> dict:
+    yq = load_years_quarters()
+    return {
+        "years": sorted(int(y) for y in yq["Year"].unique()),
+        "quarters": sorted(int(q) for q in yq["Quater"].unique()),
+        "states": list(INDIA_STATES),
+    }
+
+def _values(query: dict, name: str) -> list | None:
+    raw = [v for item in query.get(name, []) for v in item.split(",") if v.strip()]
+    return [v.strip() for v in raw] if raw else None
+
+# Query string -> loader filters, defaulting to everything and rejecting values the data does not have
+def parse_filters(query: dict) -> dict:
+    allowed = available_filters()
+    filters = {}
+    for name, cast in (("years", int), ("quarters", int), ("states", str)):
+        values = _values(query, name)
+        if values is None:
+            filters[name] = allowed[name]
+            continue
+        try:
+            values = [cast(v) for v in values]
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be a comma-separated list of {cast.__name__}s")
+        unknown = [v for v in values if v not in allowed[name]]
+        if unknown:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown {name}: {unknown}")
+        filters[name] = sorted(set(values), key=allowed[name].index)
+    state = (_values(query, "state") or [None])[0]
+    if state is not None and state not in allowed["states"]:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown state: {state!r}")
+    filters["state"] = state
+    return filters
+
+# Tuple results (e.g. the category rollup) are exposed as "<name>.0", "<name>.1"
+def flatten(data: dict) -> dict:
+    frames = {}
+    for name, result in data.items():
+        if isinstance(result, tuple):
+            frames.update({f"{name}.{i}": df for i, df in enumerate(result)})
+        else:
+            frames[name] = result
+    return frames
+
+def dataset_names(case: str) -> list:
+    names = []
+    for name, (fn, _) in PAGE_PLANS[case].items():
+        parts = len(getattr(fn, "schemas", ())) or 1
+        names += [name] if parts == 1 else [f"{name}.{i}" for i in range(parts)]
+    return names
+
+def case_by_slug(slug: str) -> str:
+    for case in CASE_STUDIES:
+        if slugify(case) == slug:
+            return case
+    raise ApiError(HTTPStatus.NOT_FOUND, f"unknown case study {slug!r}")
+
+def load_case(case: str, filters: dict, only: str | None = None) -> dict:
+    plan = page_plan(case, filters["years"], filters["quarters"], filters["states"], filters["state"])
+    if only is not None:
+        base = only.split(".")[0]
+        if base not in plan or only not in dataset_names(case):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"{case!r} has no dataset {only!r}")
+        plan = {base: plan[base]}
+    CASE.set(f"api:{case}")
+    return flatten(fetch_all(plan, FETCH_WORKERS, in_context))
+
+def frame_json(df: pd.DataFrame) -> str:
+    return df.to_json(orient="records", date_format="iso")
+
+def frame_arrow(df: pd.DataFrame) -> bytes:
+    sink = io.BytesIO()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+# Weak validator: the same data version, resource and representation always produce the same ETag
+def etag(version: str, path: str, params: dict, fmt: str) -> str:
+    key = json.dumps([version, path, params, fmt], sort_keys=True, default=str)
+    return 'W/"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+def etag_matches(header: str | None, tag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    weak = lambda t: t.strip()[2:] if t.strip().startswith("W/") else t.strip()
+    return weak(tag) in {weak(t) for t in header.split(",")}
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "PhonePeAPI/1"
+
+    def log_message(self, fmt, *args):
+        logger.info("%s %s", self.address_string(), fmt % args)
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        route = "unknown"
+        try:
+            route, status = self.route(url.path.rstrip("/") or "/", parse_qs(url.query))
+        except ApiError as e:
+            status = e.status
+            self.send_body(e.status, json.dumps({"error": str(e)}).encode(), "application/json")
+        except Exception as e:
+            logger.exception("request %s failed", self.path)
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            self.send_body(status, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode(), "application/json")
+        REGISTRY.record("api", f"{route} {int(status)}", time.perf_counter() - start, case="")
+
+    def wants_arrow(self, query: dict) -> bool:
+        fmt = (_values(query, "format") or [""])[0]
+        return fmt == "arrow" or (not fmt and ARROW_MIME in (self.headers.get("Accept") or ""))
+
+    def route(self, path: str, query: dict) -> tuple:
+        parts = path.strip("/").split("/")
+        if path == "/v1/health":
+            return "health", self.send_json({"status": "ok", "version": data_version()}, cache=False)
+        if path == "/metrics":
+            return "metrics", self.send_body(HTTPStatus.OK, REGISTRY.prometheus_text().encode(), "text/plain; version=0.0.4")
+        if path == "/v1/filters":
+            return "filters", self.send_json(available_filters())
+        if path == "/v1/cases":
+            listing = [{"case": c, "slug": slugify(c), "datasets": dataset_names(c)} for c in CASE_STUDIES]
+            return "cases", self.send_json({"cases": listing})
+        if len(parts) in (3, 4) and parts[:2] == ["v1", "cases"]:
+            case = case_by_slug(parts[2])
+            dataset = parts[3] if len(parts) == 4 else None
+            filters = parse_filters(query)
+            arrow = dataset is not None and self.wants_arrow(query)
+            tag = etag(data_version(), path, filters, "arrow" if arrow else "json")
+            # Revalidation is answered from the data version alone; no loader runs
+            if etag_matches(self.headers.get("If-None-Match"), tag):
+                return "case", self.send_not_modified(tag)
+            frames = load_case(case, filters, dataset)
+            if arrow:
+                return "dataset", self.send_body(HTTPStatus.OK, frame_arrow(frames[dataset]), ARROW_MIME, tag)
+            if dataset is not None:
+                return "dataset", self.send_body(HTTPStatus.OK, frame_json(frames[dataset]).encode(), "application/json", tag)
+            meta = json.dumps({"case": case, "version": data_version(), "filters": filters})
+            body = meta[:-1] + ', "datasets": {' + ", ".join(f"{json.dumps(n)}: {frame_json(df)}" for n, df in frames.items()) + "}}"
+            return "case", self.send_body(HTTPStatus.OK, body.encode(), "application/json", tag)
+        raise ApiError(HTTPStatus.NOT_FOUND, f"no route for {path!r}")
+
+    def send_json(self, payload: dict, cache: bool = True) -> HTTPStatus:
+        body = json.dumps(payload).encode()
+        tag = etag(data_version(), self.path, {}, "json") if cache else None
+        if tag and etag_matches(self.headers.get("If-None-Match"), tag):
+            return self.send_not_modified(tag)
+        return self.send_body(HTTPStatus.OK, body, "application/json", tag)
+
+    def send_headers(self, tag: str | None):
+        if tag:
+            self.send_header("ETag", tag)
+            self.send_header("Cache-Control", f"public, max-age={API_MAX_AGE}")
+            self.send_header("Vary", "Accept")
+        else:
+            self.send_header("Cache-Control", "no-store")
+
+    def send_not_modified(self, tag: str) -> HTTPStatus:
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_headers(tag)
+        self.end_headers()
+        return HTTPStatus.NOT_MODIFIED
+
+    def send_body(self, status: HTTPStatus, body: bytes, content_type: str, tag: str | None = None) -> HTTPStatus:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_headers(tag)
+        self.end_headers()
+        self.wfile.write(body)
+        return status
+
+def create_server(host: str = API_HOST, port: int = API_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the dashboard's case-study datasets as JSON/Arrow")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    # The loaders' Streamlit caches run without a Streamlit server here
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    server = create_server(args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/v1/cases")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
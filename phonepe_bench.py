@@ -0,0 +1,283 @@
+# Reproducible benchmarks over synthetic Pulse data (phonepe_synth.py): ingestion throughput, loader latency
+# per filter set (cold and cached), figure build time and full page renders per case study. Results are JSON
+# so two runs can be compared.
+#
+#   python phonepe_bench.py run --scale small --backend sqlite --out bench_results.json
+#   python phonepe_bench.py compare baseline.json bench_results.json --threshold 0.15
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib import metadata
+
+import numpy as np
+
+from phonepe_synth import SCALES, dataset_paths, prepare, resolve_scale
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "phonepe_app.py")
+SCENARIOS = ["ingest", "loaders", "figures", "pages"]
+
+# Arguments each loader takes, by filter name
+LOADER_ARGS = {
+    "load_user_statewise": ("years", "quarters", "states"),
+    "load_user_yearly": ("quarters",),
+    "load_user_brand": ("state", "years", "quarters"),
+    "load_insurance_statewise": ("years", "quarters", "states"),
+    "load_insurance_yearly": ("quarters",),
+    "load_insurance_engagement_statewise": ("years", "quarters", "states"),
+    "load_insurance_engagement_yearly": ("quarters",),
+    "load_tran_statewise_from_map": ("years", "quarters", "states"),
+    "load_tran_yearly_from_map": ("quarters",),
+    "load_top_user_statewise": ("years", "quarters", "states"),
+    "load_top_user_yearly": ("quarters",),
+    "load_payment_categories_rollup": ("years", "quarters", "states"),
+    "load_payment_categories_yearly": ("quarters", "states"),
+    "load_payment_categories_overall": ("years", "quarters"),
+}
+
+def stats(samples: list) -> dict:
+    a = np.asarray(samples, dtype=float)
+    return {
+        "runs": len(a),
+        "min": round(float(a.min()), 6),
+        "median": round(float(np.median(a)), 6),
+        "p95": round(float(np.percentile(a, 95)), 6),
+        "mean": round(float(a.mean()), 6),
+    }
+
+# `setup` runs untimed before every sample
+def measure(fn, repeat: int, setup=None) -> list:
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def result(scenario: str, name: str, samples: list, **params) -> dict:
+    return {"scenario": scenario, "name": name, "params": params, "seconds": stats(samples)}
+
+# Representative sidebar selections: everything, the latest year, the latest quarter and a handful of states
+def filter_sets(years: list, quarters: list, states: list) -> dict:
+    return {
+        "all": {"years": years, "quarters": quarters, "states": states, "state": None},
+        "latest_year": {"years": years[-1:], "quarters": quarters, "states": states, "state": None},
+        "latest_quarter": {"years": years[-1:], "quarters": quarters[-1:], "states": states, "state": None},
+        "five_states": {"years": years, "quarters": quarters, "states": states[:5], "state": states[0]},
+    }
+
+def clear_data_caches():
+    import streamlit as st
+    from phonepe_loaders import get_cube, load_schema_catalog
+
+    get_cube.clear()
+    load_schema_catalog.clear()
+    st.cache_data.clear()
+
+def bench_ingest(paths: dict, repeat: int, workers: int | None) -> list:
+    from phonepe_ingest import DATASETS, discover, ingest
+    from phonepe_synth import build_standin
+
+    files = sum(len(discover(paths["pulse"], t)) for t in DATASETS)
+    frames = {}
+
+    def run():
+        frames.update(ingest(paths["pulse"], workers=workers))
+
+    samples = measure(run, repeat)
+    rows = sum(len(df) for df in frames.values())
+    out = result("ingest", "parse_json_tree", samples, workers=workers)
+    out.update(files=files, rows=rows, files_per_s=round(files / np.median(samples), 1), rows_per_s=round(rows / np.median(samples), 1))
+    url = "sqlite:///" + os.path.join(os.path.dirname(paths["db"]), "bench_load.db").replace("\\", "/")
+    load = measure(lambda: build_standin(url, frames), repeat)
+    os.remove(url[len("sqlite:///"):])
+    loaded = result("ingest", "bulk_load_standin", load)
+    loaded.update(rows=rows, rows_per_s=round(rows / np.median(load), 1))
+    return [out, loaded]
+
+def bench_loaders(filters: dict, repeat: int) -> list:
+    import phonepe_loaders
+
+    out = []
+    for name, arg_names in LOADER_ARGS.items():
+        fn = getattr(phonepe_loaders, name)
+        for set_name, f in filters.items():
+            args = [f[a] for a in arg_names]
+            call = lambda: fn(*args)
+            cold = measure(call, repeat, setup=clear_data_caches)
+            warm = measure(call, repeat)
+            res = call()
+            rows = sum(len(df) for df in res) if isinstance(res, tuple) else len(res)
+            out.append(dict(result("loader", name, cold, filters=set_name, cache="cold"), rows=rows))
+            out.append(dict(result("loader", name, warm, filters=set_name, cache="warm"), rows=rows))
+    return out
+
+def bench_figures(filters: dict, repeat: int) -> list:
+    from phonepe_figures import category_split_figure, india_map_figure, top10_states_figure
+    from phonepe_geo import load_india_geojson
+    from phonepe_loaders import load_payment_categories_rollup, load_user_statewise
+
+    try:
+        geojson = load_india_geojson()
+    except OSError:
+        geojson = None
+    f = filters["all"]
+    users = load_user_statewise(f["years"], f["quarters"], f["states"])
+    cat_state, cat_totals = load_payment_categories_rollup(f["years"], f["quarters"], f["states"])
+    builders = {
+        "india_map": lambda: india_map_figure(users, "Users", "Registered Users by State", geojson),
+        "india_map_log": lambda: india_map_figure(users, "AppOpens", "App Opens by State", geojson, log_scale=True, color_scale="Plasma"),
+        "top10_states": lambda: top10_states_figure(users, "Users", "Top 10 States by Registered Users"),
+        "category_split": lambda: category_split_figure(cat_state, cat_totals),
+    }
+    out = []
+    for name, build in builders.items():
+        out.append(result("figure", name, measure(build, repeat), local_geojson=geojson is not None))
+        out[-1]["json_bytes"] = len(build().to_json())
+    return out
+
+# Each case study is rendered through Streamlit's AppTest: loaders, figure builds and element serialization
+def bench_pages(repeat: int) -> list:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    cases = list(at.sidebar.selectbox[0].options)
+    out = []
+    for case in cases:
+        def render():
+            at.sidebar.selectbox[0].select(case).run()
+            if at.exception:
+                raise RuntimeError(f"{case}: {at.exception[0].message}")
+
+        def reset():
+            at.sidebar.selectbox[0].select(cases[0] if case != cases[0] else cases[1]).run()
+            clear_data_caches()
+
+        cold = measure(render, repeat, setup=reset)
+        warm = measure(render, repeat, setup=lambda: at.sidebar.selectbox[0].select(cases[0] if case != cases[0] else cases[1]).run())
+        charts = len(at.get("plotly_chart"))
+        out.append(dict(result("page", case, cold, cache="cold"), charts=charts))
+        out.append(dict(result("page", case, warm, cache="warm"), charts=charts))
+    return out
+
+def environment() -> dict:
+    versions = {}
+    for pkg in ("pandas", "numpy", "sqlalchemy", "plotly", "streamlit", "duckdb", "pyarrow"):
+        try:
+            versions[pkg] = metadata.version(pkg)
+        except metadata.PackageNotFoundError:
+            versions[pkg] = None
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(APP_PATH),
+                             capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        rev = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(), "git": rev, "packages": versions}
+
+# phonepe_db reads its settings at import time, so the stand-in is selected before any loader module loads
+def use_standin(paths: dict, backend: str):
+    os.environ["PHONEPE_BACKEND"] = "snapshot" if backend == "snapshot" else "tidb"
+    os.environ["PHONEPE_DB_URL"] = paths["url"]
+    os.environ["PHONEPE_SNAPSHOT_DIR"] = paths["snapshot"]
+    # Background warm-up would pre-fill the caches the cold scenarios are meant to miss
+    os.environ["PHONEPE_WARMUP"] = "0"
+
+def run(args) -> dict:
+    scale = resolve_scale(args.scale, **{dim: getattr(args, dim) for dim in SCALES["small"]})
+    paths = dataset_paths(args.data)
+    use_standin(paths, args.backend)
+    prepare(args.data, scale, args.seed, args.workers)
+    from phonepe_loaders import load_years_quarters
+    from phonepe_states import INDIA_STATES
+
+    yq = load_years_quarters()
+    filters = filter_sets(sorted(yq["Year"].unique().tolist()), sorted(yq["Quater"].unique().tolist()), INDIA_STATES)
+    results = []
+    for scenario in args.scenarios:
+        start = time.perf_counter()
+        if scenario == "ingest":
+            results += bench_ingest(paths, args.repeat, args.workers)
+        elif scenario == "loaders":
+            results += bench_loaders(filters, args.repeat)
+        elif scenario == "figures":
+            results += bench_figures(filters, args.repeat)
+        elif scenario == "pages":
+            results += bench_pages(args.repeat)
+        print(f"{scenario}: done in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return {
+        "meta": dict(environment(), created_at=time.strftime("%Y-%m-%d %H:%M:%S"), backend=args.backend,
+                     scale=scale, seed=args.seed, repeat=args.repeat),
+        "results": results,
+    }
+
+def result_key(r: dict) -> tuple:
+    return (r["scenario"], r["name"], tuple(sorted((k, str(v)) for k, v in r["params"].items())))
+
+# Median-to-median ratios; anything slower than 1 + threshold is reported as a regression
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    base = {result_key(r): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        old = base.get(result_key(r))
+        if old is None:
+            continue
+        ratio = r["seconds"]["median"] / old["seconds"]["median"] if old["seconds"]["median"] else float("inf")
+        rows.append({"key": result_key(r), "before": old["seconds"]["median"], "after": r["seconds"]["median"],
+                     "ratio": ratio, "regression": ratio > 1 + threshold})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PhonePe dashboard on synthetic data")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="generate (or reuse) synthetic data and time the scenarios")
+    p_run.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for dim in SCALES["small"]:
+        p_run.add_argument(f"--{dim}", type=int, default=None)
+    p_run.add_argument("--seed", type=int, default=0)
+    p_run.add_argument("--data", default="bench_data", help="directory for the generated tree, tables and stand-in")
+    p_run.add_argument("--backend", choices=["sqlite", "snapshot"], default="sqlite")
+    p_run.add_argument("--scenarios", nargs="*", choices=SCENARIOS, default=SCENARIOS)
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--workers", type=int, default=None)
+    p_run.add_argument("--out", default="bench_results.json")
+    p_cmp = sub.add_parser("compare", help="compare two result files")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+    if args.command == "run":
+        # Loaders and AppTest run without a Streamlit server; its bare-mode warnings would drown the progress lines
+        logging.getLogger("streamlit").setLevel(logging.ERROR)
+        doc = run(args)
+        with open(args.out, "w") as f:
+            json.dump(doc, f, indent=1)
+        print(f"{len(doc['results'])} results written to {args.out}")
+        return
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    with open(args.current, "r") as f:
+        current = json.load(f)
+    for key in ("backend", "scale", "seed"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"warning: runs differ in {key} ({baseline['meta'].get(key)} vs {current['meta'].get(key)})")
+    rows = compare(baseline, current, args.threshold)
+    for r in rows:
+        scenario, name, params = r["key"]
+        label = f"{scenario} {name} " + " ".join(f"{k}={v}" for k, v in params)
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(f"{label:<90} {r['before'] * 1e3:10.2f}ms -> {r['after'] * 1e3:10.2f}ms  x{r['ratio']:.2f}{flag}")
+    regressions = sum(r["regression"] for r in rows)
+    print(f"{len(rows)} compared, {regressions} regressions over {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# Bulk loader for the ingested tables: multi-row INSERT batches or LOAD DATA LOCAL INFILE. Chunks load in parallel
+# into a staging table; one transaction then moves them into the table (after the replace-mode DELETE) and refreshes
+# the summary, so readers see either the old or the new table.
+#
+#   python phonepe_bulkload.py ingested --method infile --chunk-rows 50000 --workers 4 --mode replace
+import argparse
+import glob
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy import Column, MetaData, Table, inspect, text
+
+from phonepe_db import REMOTE_URL, create_remote_engine
+from phonepe_schema import SUMMARY_SPECS, SUMMARY_TABLES, TABLE_SCHEMAS, create_fact_table, migrate
+from phonepe_summary import refresh_summary
+
+CHUNK_ROWS = 20_000
+LOAD_WORKERS = 4
+
+logger = logging.getLogger("phonepe.bulkload")
+
+def frame_records(chunk: pd.DataFrame) -> list:
+    return chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+
+# A load method is (encode, write): each worker thread encodes a chunk and writes it to the staging table on its own
+# connection. encode returns the payload and its size in bytes (text length of the bound values / CSV size).
+def _encode_records(chunk: pd.DataFrame) -> tuple:
+    records = frame_records(chunk)
+    return records, sum(len(str(v)) for r in records for v in r.values() if v is not None)
+
+def _insert_records(conn, table: Table, columns: list, records: list):
+    conn.execute(table.insert(), records)
+
+# LOAD DATA field encoding with ESCAPED BY '': strings are always enclosed in quotes (quotes doubled), so only an
+# unenclosed NULL is read back as NULL; a string "NULL" or a backslash stays literal
+def infile_field(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+def write_infile_csv(chunk: pd.DataFrame, f):
+    for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+        f.write(",".join(infile_field(v) for v in row) + "\n")
+
+def _encode_infile(chunk: pd.DataFrame) -> tuple:
+    f = io.StringIO(newline="")
+    write_infile_csv(chunk, f)
+    data = f.getvalue().encode("utf-8")
+    return data, len(data)
+
+# MySQL/TiDB only: the CSV is spooled to a file and streamed by the server's bulk path
+def _load_infile(conn, table: Table, columns: list, data: bytes):
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        cols = ", ".join(f"`{c}`" for c in columns)
+        safe_path = path.replace("\\", "/").replace("'", "''")
+        conn.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{safe_path}' INTO TABLE `{table.name}` "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' ({cols})"
+        )
+    finally:
+        os.remove(path)
+
+LOAD_METHODS = {"multirow": (_encode_records, _insert_records), "infile": (_encode_infile, _load_infile)}
+
+# Missing tables (and their summary) get the typed DDL from phonepe_schema, or the frame's dtypes for unknown tables.
+# DDL commits implicitly on MySQL, so it runs before the load's transaction.
+def prepare_table(engine, name: str, df: pd.DataFrame) -> Table:
+    if not inspect(engine).has_table(name):
+        if name in TABLE_SCHEMAS:
+            create_fact_table(engine, name)
+        else:
+            df.head(0).to_sql(name, engine, index=False)
+    if name in SUMMARY_TABLES:
+        SUMMARY_TABLES[name].create(engine, checkfirst=True)
+    return Table(name, MetaData(), autoload_with=engine)
+
+# Same columns and types as `table`, without keys or indexes; any leftover from an aborted load is dropped first
+def create_staging_table(engine, table: Table) -> Table:
+    staging = Table(f"{table.name}_staging", MetaData(), *[Column(c.name, c.type) for c in table.c])
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {staging.name}"))
+        staging.create(conn)
+    return staging
+
+def load_table(engine, name: str, df: pd.DataFrame, method: str = "multirow", chunk_rows: int = CHUNK_ROWS,
+               workers: int = LOAD_WORKERS, mode: str = "append") -> dict:
+    start = time.perf_counter()
+    table = prepare_table(engine, name, df)
+    # Legacy tables that predate a column (e.g. state_id) are loaded without it
+    df = df[[c for c in df.columns if c in table.c]]
+    columns = list(df.columns)
+    encode, write = LOAD_METHODS[method]
+    chunks = [df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows)]
+    staging = create_staging_table(engine, table)
+
+    def load_chunk(chunk: pd.DataFrame) -> int:
+        payload, size = encode(chunk)
+        with engine.begin() as conn:
+            write(conn, staging, columns, payload)
+        return size
+
+    # A failed chunk leaves the table untouched; only the staging table is thrown away
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            sizes = list(pool.map(load_chunk, chunks))
+        cols = ", ".join(columns)
+        with engine.begin() as conn:
+            if mode == "replace":
+                conn.execute(text(f"DELETE FROM {name}"))
+            conn.execute(text(f"INSERT INTO {name} ({cols}) SELECT {cols} FROM {staging.name}"))
+            if name in SUMMARY_SPECS:
+                refresh_summary(conn, name)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {staging.name}"))
+    seconds = time.perf_counter() - start
+    return {
+        "table": name,
+        "rows": len(df),
+        "bytes": sum(sizes),
+        "chunks": len(chunks),
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(len(df) / seconds, 1) if seconds else None,
+        "mb_per_s": round(sum(sizes) / seconds / 1e6, 3) if seconds else None,
+    }
+
+# Tables load one after another so each gets the full worker budget; the engine (and its pool) is shared.
+# The pool holds one connection per worker; the final move into the table runs after the workers have returned theirs.
+# Each table's metrics are returned and logged as one JSON line on the "phonepe.bulkload" logger.
+def load_tables(engine, frames: dict, **options) -> list:
+    metrics = []
+    for name, df in frames.items():
+        m = load_table(engine, name, df, **options)
+        logger.info(json.dumps(m))
+        metrics.append(m)
+    return metrics
+
+def bulk_engine(url: str = REMOTE_URL, workers: int = LOAD_WORKERS, method: str = "multirow"):
+    connect_args = {"local_infile": True} if method == "infile" else {}
+    return create_remote_engine(url, pool_size=workers, max_overflow=0, connect_args=connect_args)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load ingested Parquet tables into TiDB")
+    parser.add_argument("source", help="directory of <table>.parquet files written by phonepe_ingest.py")
+    parser.add_argument("--tables", nargs="*", default=None)
+    parser.add_argument("--method", choices=sorted(LOAD_METHODS), default="multirow")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS)
+    parser.add_argument("--mode", choices=["append", "replace"], default="append")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    paths = sorted(glob.glob(os.path.join(args.source, "*.parquet")))
+    frames = {os.path.splitext(os.path.basename(p))[0]: p for p in paths}
+    if args.tables:
+        frames = {t: frames[t] for t in args.tables}
+    engine = bulk_engine(workers=args.workers, method=args.method)
+    try:
+        migrate(engine)
+        load_tables(engine, {t: pd.read_parquet(p) for t, p in frames.items()},
+                    method=args.method, chunk_rows=args.chunk_rows, workers=args.workers, mode=args.mode)
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
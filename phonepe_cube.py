@@ -0,0 +1,118 @@
+# Dense State × Year × Quarter (× Category/Brand) cubes that answer every sidebar filter combination in memory
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from phonepe_dtypes import compact
+from phonepe_states import canonical_states
+
+BASE_DIMS = ["state", "year", "quarter"]
+
+# table -> (dimensions, measures), in the logical field names used by the schema catalog
+CUBE_SPECS = {
+    "Aggre_transaction": (BASE_DIMS + ["type"], ["count", "amount"]),
+    "Aggre_user": (BASE_DIMS + ["brand"], ["count"]),
+    "Map_user": (BASE_DIMS, ["users", "opens"]),
+    "Map_insurance": (BASE_DIMS, ["count", "amount"]),
+    "Map_transaction": (BASE_DIMS, ["count", "amount"]),
+    "Top_user": (BASE_DIMS, ["users"]),
+    "Top_insurance": (BASE_DIMS, ["count", "amount"]),
+}
+
+# Logical field -> column kind of the grouped frames (see phonepe_dtypes.py); raw state spellings are kept as plain categories
+FIELD_KINDS = {"state": "dim", "type": "dim", "brand": "dim", "year": "year", "quarter": "quarter", "amount": "amount", "_rows": "count"}
+
+# MySQL/TiDB compare strings case-insensitively, so the cube masks do too
+def _fold(values) -> np.ndarray:
+    return np.array([v.casefold() if isinstance(v, str) else v for v in values], dtype=object)
+
+class Cube:
+    def __init__(self, dims: list, labels: dict, measures: dict, rows: np.ndarray, dtypes: dict | None = None):
+        self.dims = dims
+        self.labels = labels
+        self.measures = measures
+        self.rows = rows
+        # Categorical dimensions are handed back with their original dtype
+        self.dtypes = dtypes or {}
+        # Count-like measures are stored as float64 but handed back as integers
+        self.integral = {m for m, a in measures.items() if np.array_equal(a, np.round(a))}
+        # Canonical state -> raw spellings found in the table, for queries that go back to the database
+        self.spellings = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dims: list, measures: list, rows_col: str = "_rows"):
+        df = df.dropna(subset=dims)
+        labels, codes, dtypes = {}, [], {}
+        for dim in dims:
+            if isinstance(df[dim].dtype, pd.CategoricalDtype):
+                dtypes[dim] = df[dim].dtype
+            cat = pd.Categorical(df[dim])
+            labels[dim] = np.asarray(cat.categories, dtype=object)
+            codes.append(np.asarray(cat.codes, dtype=np.int64))
+        shape = tuple(len(labels[d]) for d in dims)
+        size = int(np.prod(shape))
+        flat = np.ravel_multi_index(codes, shape) if len(df) else np.zeros(0, dtype=np.int64)
+        rows = df[rows_col].to_numpy(dtype=float) if rows_col in df.columns else np.ones(len(df))
+        arrays = {
+            m: np.bincount(flat, weights=pd.to_numeric(df[m]).fillna(0).to_numpy(dtype=float), minlength=size).reshape(shape)
+            for m in measures
+        }
+        return cls(dims, labels, arrays, np.bincount(flat, weights=rows, minlength=size).reshape(shape), dtypes)
+
+    def axis_mask(self, dim: str, allowed) -> np.ndarray:
+        labels = self.labels[dim]
+        if allowed is None:
+            return np.ones(len(labels), dtype=bool)
+        return np.isin(_fold(labels), _fold(list(allowed)))
+
+    # In-memory GROUPING SETS: the filtered sub-cube is cut once and every grouping set is summed from it.
+    # Each result keeps its `by` dimensions in cube axis order.
+    def rollup(self, grouping_sets: list, **filters) -> list:
+        masks = [self.axis_mask(d, filters.get(d)) for d in self.dims]
+        index = np.ix_(*masks)
+        rows = self.rows[index]
+        measures = {name: arr[index] for name, arr in self.measures.items()}
+        return [self._project(rows, measures, masks, by) for by in grouping_sets]
+
+    def slice(self, by: list, **filters) -> pd.DataFrame:
+        return self.rollup([by], **filters)[0]
+
+    def _project(self, rows: np.ndarray, measures: dict, masks: list, by: list) -> pd.DataFrame:
+        drop = tuple(i for i, d in enumerate(self.dims) if d not in by)
+        present = np.nonzero(rows.sum(axis=drop) > 0)
+        kept = [(i, d) for i, d in enumerate(self.dims) if d in by]
+        out = {}
+        for k, (i, d) in enumerate(kept):
+            values = self.labels[d][masks[i]][present[k]]
+            out[d] = pd.Categorical(values, dtype=self.dtypes[d]) if d in self.dtypes else values
+        for name, arr in measures.items():
+            values = arr.sum(axis=drop)[present]
+            out[name] = values.astype(np.int64) if name in self.integral else values
+        return pd.DataFrame(out)
+
+# One GROUP BY at the finest dashboard grain; `cols` maps logical fields to the table's real column names.
+# `source` reads a pre-aggregated summary of `table` instead, whose `rows` column counts the rows behind each group.
+def query_cube_frame(engine, table: str, cols: dict, source: str | None = None) -> pd.DataFrame:
+    dims, measures = CUBE_SPECS[table]
+    missing = [f for f in dims + measures + (["rows"] if source else []) if not cols.get(f)]
+    if missing:
+        raise KeyError(f"{source or table} has no column for {missing}")
+    group = ", ".join(cols[d] for d in dims)
+    sums = ", ".join(f"SUM({cols[m]})" for m in measures)
+    rows = f"SUM({cols['rows']})" if source else "COUNT(*)"
+    q = text(f"SELECT {group}, {sums}, {rows} FROM {source or table} GROUP BY {group}")
+    with engine.connect() as conn:
+        df = pd.read_sql_query(q, conn)
+    df.columns = dims + measures + ["_rows"]
+    return compact(df, {c: FIELD_KINDS.get(c, "count") for c in df.columns}, arrow=False)
+
+def cube_from_grouped(table: str, df: pd.DataFrame) -> Cube:
+    dims, measures = CUBE_SPECS[table]
+    df = df.copy()
+    raw = df["state"]
+    # Spelling variants of a state collapse onto one canonical state before the cube is built
+    df["state"] = canonical_states(raw)
+    cube = Cube.from_frame(df, dims, measures)
+    pairs = pd.DataFrame({"state": df["state"].astype(object), "raw": raw.astype(object)}).dropna().drop_duplicates()
+    cube.spellings = pairs.groupby("state")["raw"].agg(list).to_dict()
+    return cube
@@ -0,0 +1,72 @@
+# Database settings and engine factories shared by the dashboard and the command-line tools
+import json
+import os
+
+from sqlalchemy import bindparam, create_engine, event, text
+
+REMOTE_URL = os.environ.get(
+    "PHONEPE_DB_URL",
+    "mysql+pymysql://13DQLuf64nn2jC2.root:Yl91nAYMjEKQwgQK@"
+    "gateway01.ap-southeast-1.prod.aws.tidbcloud.com:4000/phonepe",
+)
+SSL_CA = os.environ.get("PHONEPE_SSL_CA", r"C:\\Users\\rosha\\Downloads\\phonepe project\\ca.pem")
+
+# "tidb" queries the remote database, "snapshot" queries the local Parquet files written by phonepe_snapshot.py
+BACKEND = os.environ.get("PHONEPE_BACKEND", "tidb")
+SNAPSHOT_DIR = os.environ.get("PHONEPE_SNAPSHOT_DIR", "snapshot")
+
+# SQLAlchemy pool of the dashboard engine, shared by every session of a server process
+DB_POOL_SIZE = int(os.environ.get("PHONEPE_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("PHONEPE_DB_MAX_OVERFLOW", "10"))
+
+# Concurrent page queries; kept below the pool size so page fetches never wait on overflow
+FETCH_WORKERS = int(os.environ.get("PHONEPE_FETCH_WORKERS", "4"))
+
+DASHBOARD_TABLES = [
+    "Aggre_transaction", "Aggre_user", "Map_user", "Map_insurance",
+    "Map_transaction", "Top_user", "Top_insurance",
+]
+
+# Parameters that carry filter lists and must be rendered as IN (...) on every dialect
+EXPANDING_PARAMS = ("years", "quarters", "states", "tables")
+
+def sql_text(query: str):
+    q = text(query)
+    names = [n for n in EXPANDING_PARAMS if f":{n}" in query]
+    return q.bindparams(*[bindparam(n, expanding=True) for n in names]) if names else q
+
+def create_remote_engine(url: str = REMOTE_URL, connect_args: dict | None = None, **engine_kwargs):
+    args = {"ssl": {"ca": SSL_CA}} if url.startswith("mysql") and SSL_CA else {}
+    args.update(connect_args or {})
+    return create_engine(url, connect_args=args, pool_pre_ping=True, **engine_kwargs)
+
+def snapshot_manifest(snapshot_dir: str = SNAPSHOT_DIR) -> dict | None:
+    path = os.path.join(snapshot_dir, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+# Every pooled DuckDB connection gets one view per Parquet file, so loader SQL runs unchanged
+def create_snapshot_engine(snapshot_dir: str = SNAPSHOT_DIR):
+    manifest = snapshot_manifest(snapshot_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No snapshot found in {snapshot_dir!r}; run `python phonepe_snapshot.py` first")
+    files = {t: os.path.abspath(os.path.join(snapshot_dir, f"{t}.parquet")) for t in manifest["tables"]}
+    engine = create_engine("duckdb:///:memory:")
+
+    @event.listens_for(engine, "connect")
+    def create_views(dbapi_conn, _record):
+        for table, path in files.items():
+            safe_path = path.replace("'", "''")
+            dbapi_conn.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet('{safe_path}')")
+
+    return engine
+
+def create_dashboard_engine():
+    if BACKEND == "snapshot":
+        return create_snapshot_engine()
+    return create_remote_engine(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+def catalog_schema(engine) -> str:
+    return "main" if engine.dialect.name == "duckdb" else engine.url.database
@@ -0,0 +1,63 @@
+# State -> district drill-down. The ranking runs in the database: one GROUP BY over a single state's rows,
+# ORDER BY the ranked measure with LIMIT, and keyset pagination (the last row of the previous page) instead of OFFSET.
+import os
+
+import pandas as pd
+
+from phonepe_db import sql_text
+
+DRILL_PAGE_SIZE = int(os.environ.get("PHONEPE_DRILL_PAGE_SIZE", "10"))
+
+# table -> logical measure -> column name on the page (the first one is the default ranking)
+DRILL_TABLES = {
+    "Map_transaction": {"amount": "Amount", "count": "Transactions"},
+    "Map_user": {"users": "Users", "opens": "AppOpens"},
+    "Map_insurance": {"amount": "Insurance_amount", "count": "Insurance_count"},
+    "Top_user": {"users": "TopUsers"},
+    "Top_insurance": {"amount": "Insurance_amount", "count": "Insurance_count"},
+}
+
+# Result schema of a page (see phonepe_dtypes.py)
+def page_schema(table: str) -> dict:
+    return {"District": "dim", **{name: "amount" if m == "amount" else "count" for m, name in DRILL_TABLES[table].items()}}
+
+def empty_page(table: str) -> pd.DataFrame:
+    return pd.DataFrame(columns=["District"] + list(DRILL_TABLES[table].values()))
+
+# `state_key` filters on the indexed state_id column when the table has one; the state's raw spellings are matched
+# as well, so legacy rows whose key was never backfilled still count.
+# `after` is the (ranked value, district) of the previous page's last row. One row past the page tells whether more follow.
+def query_district_page(engine, table: str, cols: dict, years: list, quarters: list, rank_by: str, spellings: list,
+                        state_key: int | None = None, after: tuple | None = None, page_size: int = DRILL_PAGE_SIZE):
+    measures = DRILL_TABLES[table]
+    missing = [f for f in ["state", "year", "quarter", "district", *measures] if not cols.get(f)]
+    if missing:
+        raise KeyError(f"{table} has no column for {missing}")
+    district, ranked = cols["district"], f"SUM({cols[rank_by]})"
+    select = ", ".join([f"{district} AS District"] + [f"SUM({cols[m]}) AS {name}" for m, name in measures.items()])
+    where = [
+        f"(state_id = :state_key OR {cols['state']} IN :states)" if state_key is not None else f"{cols['state']} IN :states",
+        f"{cols['year']} IN :years",
+        f"{cols['quarter']} IN :quarters",
+        f"{district} IS NOT NULL",
+    ]
+    params = {"states": list(spellings), "years": [int(y) for y in years], "quarters": [int(q) for q in quarters],
+              "limit": page_size + 1}
+    if state_key is not None:
+        params["state_key"] = int(state_key)
+    having = ""
+    if after is not None:
+        having = f" HAVING {ranked} < :after_value OR ({ranked} = :after_value AND {district} > :after_district)"
+        params.update(after_value=after[0], after_district=after[1])
+    q = sql_text(
+        f"SELECT {select} FROM {table} WHERE {' AND '.join(where)} GROUP BY {district}{having} "
+        f"ORDER BY {ranked} DESC, {district} LIMIT :limit"
+    )
+    with engine.connect() as conn:
+        df = pd.read_sql_query(q, conn, params=params)
+    return df.head(page_size), len(df) > page_size
+
+# Keyset cursor for the page after `page`
+def next_cursor(page: pd.DataFrame, rank_col: str) -> tuple:
+    last = page.iloc[-1]
+    return (last[rank_col].item() if hasattr(last[rank_col], "item") else last[rank_col], str(last["District"]))
@@ -0,0 +1,77 @@
+# Compact dtypes for loader results. Each loader declares its columns as logical kinds; dimensions become categoricals,
+# year/quarter and counts are downcast, amounts stay float64 (rupee totals need the precision).
+#
+#   PHONEPE_ARROW_DTYPES=1  Arrow-backed numeric columns (int16/int32/double[pyarrow]) instead of NumPy ones
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from phonepe_states import INDIA_STATES, STATE_DTYPE
+
+ARROW_DTYPES = os.environ.get("PHONEPE_ARROW_DTYPES", "0") == "1"
+
+# Counts are never narrowed below int32, so sums and differences computed downstream cannot overflow
+_INT_LADDER = [np.int32, np.int64]
+
+def _smallest_int(s: pd.Series):
+    if s.empty:
+        return _INT_LADDER[0]
+    lo, hi = s.min(), s.max()
+    return next(t for t in _INT_LADDER if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max)
+
+def _categorical(s: pd.Series, categories=None) -> pd.Series:
+    s = s.astype(object)
+    if categories is not None:
+        extra = sorted(set(s.dropna()) - set(categories))
+        dtype = STATE_DTYPE if not extra else pd.CategoricalDtype(list(categories) + extra)
+    else:
+        dtype = pd.CategoricalDtype(sorted(s.dropna().unique().tolist()))
+    return s.astype(dtype)
+
+# Categoricals already travel as Arrow dictionaries and pandas cannot rebuild a dictionary ArrowDtype from Arrow
+# metadata, so only the numeric columns switch backends
+def _arrow(s: pd.Series, kind: str) -> pd.Series:
+    if kind in ("state", "dim"):
+        return s
+    return s.astype(pd.ArrowDtype(pa.from_numpy_dtype(s.dtype)))
+
+def cast_column(s: pd.Series, kind: str, arrow: bool = ARROW_DTYPES) -> pd.Series:
+    if kind == "state":
+        out = _categorical(s, INDIA_STATES)
+    elif kind == "dim":
+        out = _categorical(s)
+    elif kind == "year":
+        out = s.astype(np.int16)
+    elif kind == "quarter":
+        out = s.astype(np.int8)
+    elif kind == "count":
+        values = pd.to_numeric(s).fillna(0)
+        out = values.round().astype(_smallest_int(values))
+    elif kind == "amount":
+        out = pd.to_numeric(s).astype(np.float64)
+    else:
+        raise ValueError(f"Unknown column kind {kind!r}")
+    return _arrow(out, kind) if arrow else out
+
+# `schema` maps column -> kind; the result has exactly the schema's columns, in its order
+def compact(df: pd.DataFrame, schema: dict, arrow: bool = ARROW_DTYPES) -> pd.DataFrame:
+    missing = [c for c in schema if c not in df.columns]
+    if missing:
+        raise KeyError(f"Result has no column for {missing}; columns are {list(df.columns)}")
+    return pd.DataFrame({c: cast_column(df[c], kind, arrow) for c, kind in schema.items()}, index=pd.RangeIndex(len(df)))
+
+# Decorator for loaders: one schema per returned frame (a tuple result gets one schema per element)
+def typed(*schemas):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            out = fn(*args, **kwargs)
+            if len(schemas) == 1:
+                return compact(out, schemas[0])
+            return tuple(compact(df, schema) for df, schema in zip(out, schemas))
+        wrapper.schemas = schemas
+        return wrapper
+    return decorate
@@ -0,0 +1,139 @@
+# District-level exports of the Map_* tables. Rows are streamed through a server-side cursor in EXPORT_CHUNK_ROWS
+# chunks and written chunk by chunk as Parquet or gzip-compressed CSV, so a file export never holds the table in memory.
+#
+#   python phonepe_export.py Map_transaction --format parquet --years 2023 2024 --out map_transaction_2023_24.parquet
+import argparse
+import gzip
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from phonepe_db import sql_text
+from phonepe_metrics import REGISTRY
+from phonepe_states import canonical_states
+
+EXPORT_CHUNK_ROWS = int(os.environ.get("PHONEPE_EXPORT_CHUNK_ROWS", "50000"))
+
+# format -> (mime type, file extension)
+EXPORT_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "csv.gz": ("application/gzip", "csv.gz"),
+}
+
+# table -> logical field -> exported column, named like the dashboard's state-level downloads
+EXPORT_TABLES = {
+    "Map_transaction": {"count": "Transactions", "amount": "Amount"},
+    "Map_user": {"users": "Users", "opens": "AppOpens"},
+    "Map_insurance": {"count": "Insurance_count", "amount": "Insurance_amount"},
+}
+KEY_COLUMNS = {"state": "State", "year": "Year", "quarter": "Quarter", "district": "District"}
+
+def export_query(table: str, cols: dict, by_state: bool = False):
+    fields = {**KEY_COLUMNS, **EXPORT_TABLES[table]}
+    missing = [f for f in fields if not cols.get(f)]
+    if missing:
+        raise KeyError(f"{table} has no column for {missing}")
+    select = ", ".join(f"{cols[f]} AS {name}" for f, name in fields.items())
+    where = [f"{cols['year']} IN :years", f"{cols['quarter']} IN :quarters"] + ([f"{cols['state']} IN :states"] if by_state else [])
+    order = ", ".join(cols[f] for f in ("year", "quarter", "state", "district"))
+    return sql_text(f"SELECT {select} FROM {table} WHERE {' AND '.join(where)} ORDER BY {order}")
+
+# Year, Quarter and State are all filtered in SQL; `spellings` are the raw state values stored in the table (see
+# phonepe_loaders.state_spellings), None exports every state. States are canonicalised per chunk for the output only.
+def iter_district_chunks(engine, table: str, cols: dict, years: list, quarters: list, spellings: list | None = None,
+                         chunk_rows: int = EXPORT_CHUNK_ROWS):
+    params = {"years": [int(y) for y in years], "quarters": [int(q) for q in quarters]}
+    if spellings is not None:
+        params["states"] = list(spellings)
+    query = export_query(table, cols, by_state=spellings is not None)
+    yielded = False
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunk_rows) as conn:
+        for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunk_rows):
+            chunk["State"] = np.asarray(canonical_states(chunk["State"]), dtype=object)
+            if len(chunk):
+                yielded = True
+                yield chunk.reset_index(drop=True)
+    if not yielded:
+        yield pd.DataFrame(columns=list(KEY_COLUMNS.values()) + list(EXPORT_TABLES[table].values()))
+
+def write_export(chunks, fmt: str, sink) -> int:
+    rows = 0
+    if fmt == "parquet":
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(sink, table.schema, compression="zstd")
+                writer.write_table(table.cast(writer.schema))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif fmt == "csv.gz":
+        with gzip.GzipFile(fileobj=sink, mode="wb") as gz:
+            out = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(out, index=False, header=i == 0)
+                rows += len(chunk)
+            out.flush()
+            out.detach()
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {list(EXPORT_FORMATS)}")
+    return rows
+
+# Streams one export into `sink` (a path or a binary file object) and records it as an "export" span
+def export_districts(engine, table: str, cols: dict, fmt: str, sink, years: list, quarters: list, spellings: list | None = None,
+                     chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+    start = time.perf_counter()
+    if isinstance(sink, str):
+        with open(sink, "wb") as f:
+            rows = write_export(iter_district_chunks(engine, table, cols, years, quarters, spellings, chunk_rows), fmt, f)
+        nbytes = os.path.getsize(sink)
+    else:
+        offset = sink.tell()
+        rows = write_export(iter_district_chunks(engine, table, cols, years, quarters, spellings, chunk_rows), fmt, sink)
+        nbytes = sink.tell() - offset
+    REGISTRY.record("export", f"{table}.{fmt}", time.perf_counter() - start, rows, nbytes)
+    return rows
+
+# For download buttons: Streamlit sends the whole file from memory, so the finished export is returned as bytes
+def export_bytes(engine, table: str, cols: dict, fmt: str, years: list, quarters: list, spellings: list | None = None) -> bytes:
+    buf = io.BytesIO()
+    export_districts(engine, table, cols, fmt, buf, years, quarters, spellings)
+    return buf.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description="Export district-level Map_* rows as Parquet or gzip CSV")
+    parser.add_argument("table", choices=list(EXPORT_TABLES))
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--years", nargs="*", type=int, default=None, help="years to export (default: all)")
+    parser.add_argument("--quarters", nargs="*", type=int, default=None, help="quarters to export (default: all)")
+    parser.add_argument("--states", nargs="*", default=None, help="states to export (default: all)")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+    parser.add_argument("--out", default=None, help="output file (default: <table>.<extension>)")
+    args = parser.parse_args()
+
+    from phonepe_loaders import get_engine, load_years_quarters, state_spellings, table_columns
+
+    yq = load_years_quarters()
+    years = args.years or sorted(yq["Year"].unique().tolist())
+    quarters = args.quarters or sorted(yq["Quater"].unique().tolist())
+    out = args.out or f"{args.table}.{EXPORT_FORMATS[args.format][1]}"
+    start = time.perf_counter()
+    try:
+        spellings = state_spellings(args.table, list(canonical_states(args.states))) if args.states else None
+        rows = export_districts(get_engine(), args.table, table_columns(args.table), args.format, out, years, quarters,
+                                spellings, args.chunk_rows)
+    except KeyError as e:
+        sys.exit(str(e))
+    print(f"{args.table}: {rows} rows -> {out} ({os.path.getsize(out) / 2**20:.1f} MB) in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
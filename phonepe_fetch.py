@@ -0,0 +1,11 @@
+# Run the datasets a page declares up front concurrently on a bounded thread pool
+from concurrent.futures import ThreadPoolExecutor
+
+# plan: name -> (loader, args). `wrap` adapts each loader before it runs on a worker thread.
+def fetch_all(plan: dict, max_workers: int, wrap=None) -> dict:
+    wrap = wrap or (lambda fn: fn)
+    if len(plan) <= 1 or max_workers <= 1:
+        return {name: fn(*args) for name, (fn, args) in plan.items()}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(plan)), thread_name_prefix="page-fetch") as pool:
+        futures = {name: pool.submit(wrap(fn), *args) for name, (fn, args) in plan.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,150 @@
+# Plotly figure builders shared by the dashboard and the benchmarks; rendering stays in phonepe_app.py
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from phonepe_geo import INDIA_GEOJSON_URL, subset_geojson
+from phonepe_metrics import REGISTRY, timed
+from phonepe_states import canonical_states
+
+# Serialized figures kept per process; least recently used specs are evicted past the cap
+FIGURE_CACHE_MB = float(os.environ.get("PHONEPE_FIGURE_CACHE_MB", "64"))
+
+# Column names, dtypes and a hash of every value; the index is ignored
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+class FigureCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.specs = OrderedDict()
+        self.nbytes = 0
+
+    def get(self, key) -> str | None:
+        with self.lock:
+            spec = self.specs.get(key)
+            if spec is not None:
+                self.specs.move_to_end(key)
+            return spec
+
+    def put(self, key, spec: str):
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.specs:
+                self.nbytes -= len(self.specs.pop(key))
+            self.specs[key] = spec
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, old = self.specs.popitem(last=False)
+                self.nbytes -= len(old)
+
+    def clear(self):
+        with self.lock:
+            self.specs.clear()
+            self.nbytes = 0
+
+FIGURE_CACHE = FigureCache(int(FIGURE_CACHE_MB * 2**20))
+
+# Frames are keyed by content; other dicts (the GeoJSON) are long-lived cached resources, keyed by identity
+def _arg_key(value):
+    if isinstance(value, pd.DataFrame):
+        return "frame", frame_fingerprint(value)
+    if isinstance(value, dict):
+        return "object", id(value)
+    return "value", repr(value)
+
+# A repeated view rebuilds the figure from its stored JSON without validation, skipping px.* entirely
+def memoized_figure(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__name__, tuple(_arg_key(a) for a in args), tuple(sorted((k, _arg_key(v)) for k, v in kwargs.items())))
+        spec = FIGURE_CACHE.get(key)
+        REGISTRY.record_cache("figure", spec is not None)
+        if spec is not None:
+            return go.Figure(json.loads(spec), _validate=False)
+        fig = fn(*args, **kwargs)
+        FIGURE_CACHE.put(key, pio.to_json(fig, validate=False))
+        return fig
+    return wrapper
+
+# `geojson` is the simplified local outline, or None to let the browser fetch INDIA_GEOJSON_URL
+@timed("figure")
+@memoized_figure
+def india_map_figure(df: pd.DataFrame, value_col: str, title: str, geojson: dict | None = None,
+                     log_scale: bool = False, color_scale: str = "Viridis"):
+    df = df.copy()
+    if "State_geo" not in df.columns and "State" in df.columns:
+        df["State_geo"] = canonical_states(df["State"])
+    fig = px.choropleth(
+        df,
+        geojson=subset_geojson(geojson, df["State_geo"]) if geojson else INDIA_GEOJSON_URL,
+        featureidkey="properties.ST_NM",
+        locations="State_geo",
+        color=value_col,
+        title=title,
+        color_continuous_scale=color_scale,
+        range_color=[df[value_col].min(), df[value_col].max()] if not log_scale else None,
+    )
+    if log_scale:
+        fig.update_traces(z=df[value_col].apply(lambda x: max(x, 1)))  # Avoid log(0)
+        fig.update_layout(coloraxis_colorbar=dict(tickvals=[1, 10, 100, 1000, 10000], ticktext=["1", "10", "100", "1K", "10K"]))
+    fig.update_geos(fitbounds="locations", visible=False)
+    return fig
+
+@timed("figure")
+@memoized_figure
+def top10_states_figure(df: pd.DataFrame, metric_col: str, title: str):
+    top10 = df.nlargest(10, metric_col)
+    fig = px.bar(top10, x="State", y=metric_col, text=metric_col, title=title)
+    fig.update_traces(textposition="outside")
+    return fig
+
+@timed("figure")
+@memoized_figure
+def district_page_figure(page: pd.DataFrame, metric_col: str, title: str):
+    fig = px.bar(page, x=metric_col, y="District", orientation="h", text=metric_col, title=title)
+    fig.update_layout(yaxis=dict(autorange="reversed"))
+    return fig
+
+@timed("figure")
+@memoized_figure
+def category_split_figure(df_cat_state: pd.DataFrame, cat_totals: pd.DataFrame):
+    top_states = cat_totals.sort_values("Txn_amount", ascending=False).head(10)["State"].tolist()
+    df_top_cat = df_cat_state[df_cat_state["State"].isin(top_states)]
+    return px.bar(df_top_cat, x="State", y="Txn_amount", color="Category", barmode="stack", title="Top 10 States — Payment Category Amount Split")
+
+@timed("figure")
+@memoized_figure
+def growth_ranking_figure(df: pd.DataFrame, metric_col: str, label_col: str, title: str):
+    top = df.dropna(subset=[metric_col]).nlargest(10, metric_col)
+    fig = px.bar(top, x=metric_col, y=label_col, orientation="h", text=metric_col, title=title)
+    fig.update_traces(texttemplate="%{x:.1f}", textposition="outside")
+    fig.update_layout(yaxis=dict(autorange="reversed"))
+    return fig
+
+# Diverging colours centred on zero, capped at the 95th percentile of |value| so growth off a tiny base cannot wash out the rest
+@timed("figure")
+@memoized_figure
+def growth_heatmap_figure(df: pd.DataFrame, row_col: str, col_col: str, value_col: str, title: str):
+    grid = df.astype({row_col: object, col_col: object}).pivot(index=row_col, columns=col_col, values=value_col)
+    values = np.abs(grid.to_numpy(dtype=float))
+    values = values[~np.isnan(values)]
+    bound = float(np.percentile(values, 95)) if values.size else 0.0
+    bound = bound or 1.0
+    return px.imshow(grid, color_continuous_scale="RdYlGn", zmin=-bound, zmax=bound, aspect="auto", title=title,
+                     labels=dict(color=value_col))
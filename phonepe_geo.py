@@ -0,0 +1,147 @@
+# India state boundaries: shipped GeoJSON, simplified once per process for the choropleths
+#
+#   python phonepe_geo.py --download   download the source file into assets/ (one-off, then commit it)
+#   python phonepe_geo.py --tolerance 0.02
+import argparse
+import json
+import os
+import urllib.request
+
+import numpy as np
+
+INDIA_GEOJSON_URL = "https://raw.githubusercontent.com/plotly/datasets/master/india_states.geojson"
+GEOJSON_PATH = os.environ.get("PHONEPE_GEOJSON_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "india_states.geojson"))
+# Douglas-Peucker tolerance in degrees (~1 km per 0.01); 0 keeps the full-resolution outline
+GEO_TOLERANCE = float(os.environ.get("PHONEPE_GEO_TOLERANCE", "0.01"))
+COORD_DECIMALS = 4
+
+def fetch_geojson(path: str = GEOJSON_PATH, url: str = INDIA_GEOJSON_URL):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with urllib.request.urlopen(url, timeout=30) as resp, open(tmp, "wb") as f:
+        f.write(resp.read())
+    os.replace(tmp, path)
+
+def _douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        seg = points[end] - points[start]
+        rel = points[start + 1:end] - points[start]
+        norm = np.hypot(seg[0], seg[1])
+        if norm == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return points[keep]
+
+def _rings(geometry: dict) -> list:
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+def _key(point) -> tuple:
+    return (round(point[0], 7), round(point[1], 7))
+
+# Topology-preserving simplification: rings are cut into arcs at junctions (points whose neighbours differ
+# between the rings that use them) and each arc is simplified once, so shared borders stay identical.
+def simplify_geojson(geojson: dict, tolerance: float) -> dict:
+    neighbours = {}
+    for feature in geojson["features"]:
+        for polygon in _rings(feature["geometry"]):
+            for ring in polygon:
+                keys = [_key(p) for p in ring[:-1]]
+                n = len(keys)
+                for i, k in enumerate(keys):
+                    neighbours.setdefault(k, set()).add(frozenset((keys[i - 1], keys[(i + 1) % n])))
+    junctions = {k for k, sets in neighbours.items() if len(sets) > 1}
+    arc_cache = {}
+
+    def simplify_arc(points: list) -> list:
+        keys = tuple(_key(p) for p in points)
+        reverse = keys[-1] < keys[0]
+        canonical = keys[::-1] if reverse else keys
+        if canonical not in arc_cache:
+            arr = np.asarray(points[::-1] if reverse else points, dtype=float)
+            arc_cache[canonical] = _douglas_peucker(arr, tolerance).round(COORD_DECIMALS).tolist()
+        out = arc_cache[canonical]
+        return out[::-1] if reverse else out
+
+    def simplify_ring(ring: list) -> list:
+        open_ring = ring[:-1]
+        cuts = [i for i, p in enumerate(open_ring) if _key(p) in junctions]
+        if not cuts:
+            out = simplify_arc(open_ring + [open_ring[0]])
+        else:
+            rotated = open_ring[cuts[0]:] + open_ring[:cuts[0]]
+            cuts = [c - cuts[0] for c in cuts] + [len(open_ring)]
+            rotated.append(rotated[0])
+            out = []
+            for a, b in zip(cuts, cuts[1:]):
+                arc = simplify_arc(rotated[a:b + 1])
+                out.extend(arc if not out else arc[1:])
+        # A ring needs four positions to stay a polygon; tiny islands keep their original outline
+        return out if len(out) >= 4 else np.round(np.asarray(ring, dtype=float), COORD_DECIMALS).tolist()
+
+    features = []
+    for feature in geojson["features"]:
+        geometry = feature["geometry"]
+        polygons = [[simplify_ring(ring) for ring in polygon] for polygon in _rings(geometry)]
+        coords = polygons[0] if geometry["type"] == "Polygon" else polygons
+        name = feature["properties"]["ST_NM"]
+        features.append({
+            "type": "Feature",
+            "id": name,
+            "properties": {"ST_NM": name},
+            "geometry": {"type": geometry["type"], "coordinates": coords},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+# Simplified copies are written next to the source file so later processes skip the simplification
+# The source file ships with the app; it is never fetched at render time
+def load_india_geojson(tolerance: float = GEO_TOLERANCE, path: str = GEOJSON_PATH) -> dict:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"India GeoJSON not found at {path}; run `python phonepe_geo.py --download` once and commit it")
+    simplified = f"{os.path.splitext(path)[0]}.simplified-{tolerance:g}.geojson"
+    if os.path.exists(simplified) and os.path.getmtime(simplified) >= os.path.getmtime(path):
+        with open(simplified, "r") as f:
+            return json.load(f)
+    with open(path, "r") as f:
+        geojson = simplify_geojson(json.load(f), tolerance)
+    tmp = simplified + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(geojson, f, separators=(",", ":"))
+    os.replace(tmp, simplified)
+    return geojson
+
+# Only the features a figure actually colours are embedded in it
+def subset_geojson(geojson: dict, names) -> dict:
+    names = set(names)
+    return {"type": "FeatureCollection", "features": [f for f in geojson["features"] if f["id"] in names]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Download and simplify the India states GeoJSON")
+    parser.add_argument("--tolerance", type=float, default=GEO_TOLERANCE)
+    parser.add_argument("--path", default=GEOJSON_PATH)
+    parser.add_argument("--download", action="store_true", help=f"(Re)download the source file from {INDIA_GEOJSON_URL}")
+    args = parser.parse_args()
+    if args.download:
+        fetch_geojson(args.path)
+    geojson = load_india_geojson(args.tolerance, args.path)
+    points = sum(len(r) for f in geojson["features"] for p in _rings(f["geometry"]) for r in p)
+    print(f"{len(geojson['features'])} states, {points} points at tolerance {args.tolerance:g}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# Growth analytics over the dense cubes: QoQ, YoY, CAGR and share shifts for every state (and category/brand) at once.
+# A cube is laid out on a calendar State × Year × Quarter (× Category) array, so each metric is one array expression.
+import numpy as np
+import pandas as pd
+
+QUARTERS = 4
+
+# table -> ((grouping dimension, column name) or None, logical measure -> column name), named like the loaders' frames
+GROWTH_TABLES = {
+    "Aggre_transaction": (("type", "Category"), {"amount": "Txn_amount", "count": "Txn_count"}),
+    "Aggre_user": (("brand", "Brand"), {"count": "Users"}),
+    "Map_user": (None, {"users": "Users", "opens": "AppOpens"}),
+    "Map_insurance": (None, {"amount": "Insurance_amount", "count": "Insurance_count"}),
+    "Map_transaction": (None, {"amount": "Amount", "count": "Transactions"}),
+    "Top_user": (None, {"users": "TopUsers"}),
+    "Top_insurance": (None, {"amount": "Insurance_amount", "count": "Insurance_count"}),
+}
+
+# Metric columns of a growth table; shares are within the state for grouped tables, of the national total otherwise
+GROWTH_METRICS = {
+    "YoY_pct": "YoY growth (%)",
+    "QoQ_pct": "QoQ growth (%)",
+    "CAGR_pct": "CAGR (%)",
+    "Share_shift_pp": "Share shift (pp)",
+}
+
+# Result schemas (see phonepe_dtypes.py); growth rates and shares are plain float64 columns
+def growth_schema(table: str) -> dict:
+    group = GROWTH_TABLES[table][0]
+    keys = {"State": "state", **({group[1]: "dim"} if group else {})}
+    return {**keys, "Latest": "amount", "QoQ_pct": "amount", "YoY_pct": "amount", "CAGR_pct": "amount",
+            "Share_first_pct": "amount", "Share_last_pct": "amount", "Share_shift_pp": "amount"}
+
+HEATMAP_SCHEMA = {"State": "state", "Period": "dim", "Growth_pct": "amount"}
+
+def pct_change(now: np.ndarray, before: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(before > 0, (now / before - 1) * 100, np.nan)
+
+class GrowthPanel:
+    # values: (state, year, quarter[, group]) on a gap-free calendar; quarters no state has data for are NaN
+    def __init__(self, states: np.ndarray, years: np.ndarray, values: np.ndarray, present: np.ndarray,
+                 groups: np.ndarray | None = None):
+        self.states = states
+        self.years = years
+        self.values = values
+        self.present = present
+        self.groups = groups
+
+    @classmethod
+    def from_cube(cls, cube, measure: str, by: str | None = None):
+        keep = ["state", "year", "quarter"] + ([by] if by else [])
+        arr = cube.measures[measure].sum(axis=tuple(i for i, d in enumerate(cube.dims) if d not in keep))
+        rows = cube.rows.sum(axis=tuple(i for i, d in enumerate(cube.dims) if d not in ("year", "quarter")))
+        year_labels = cube.labels["year"].astype(np.int64)
+        quarter_labels = cube.labels["quarter"].astype(np.int64)
+        years = np.arange(year_labels.min(), year_labels.max() + 1) if len(year_labels) else np.zeros(0, dtype=np.int64)
+        values = np.zeros((arr.shape[0], len(years), QUARTERS) + arr.shape[3:])
+        present = np.zeros((len(years), QUARTERS), dtype=bool)
+        valid = (quarter_labels >= 1) & (quarter_labels <= QUARTERS)
+        yi, qi = (year_labels - (years[0] if len(years) else 0))[:, None], (quarter_labels - 1)[valid][None, :]
+        values[:, yi, qi] = arr[:, :, valid]
+        present[yi, qi] = rows[:, valid] > 0
+        values[:, ~present] = np.nan
+        return cls(cube.labels["state"], years, values, present, cube.labels[by] if by else None)
+
+    @property
+    def periods(self) -> np.ndarray:
+        return np.array([f"{y}Q{q}" for y in self.years for q in range(1, QUARTERS + 1)], dtype=object)
+
+    # (state, period[, group]) in calendar order
+    @property
+    def flat(self) -> np.ndarray:
+        return self.values.reshape((self.values.shape[0], -1) + self.values.shape[3:])
+
+    def qoq(self) -> np.ndarray:
+        flat = self.flat
+        return np.concatenate([np.full_like(flat[:, :1], np.nan), pct_change(flat[:, 1:], flat[:, :-1])], axis=1)
+
+    def yoy(self) -> np.ndarray:
+        flat = self.flat
+        lag = min(QUARTERS, flat.shape[1])
+        return np.concatenate([np.full_like(flat[:, :lag], np.nan), pct_change(flat[:, lag:], flat[:, :-lag])], axis=1)
+
+    # Periods inside the sidebar selection that have data
+    def period_mask(self, years: list, quarters: list) -> np.ndarray:
+        return (np.isin(self.years, [int(y) for y in years])[:, None] & np.isin(np.arange(1, QUARTERS + 1), [int(q) for q in quarters])[None, :]
+                & self.present).ravel()
+
+    # Latest selected quarter; CAGR and shares run from the first to the last selected year with every selected quarter
+    def window(self, years: list, quarters: list) -> dict:
+        in_window = np.nonzero(self.period_mask(years, quarters))[0]
+        qmask = np.isin(np.arange(1, QUARTERS + 1), [int(q) for q in quarters])
+        complete = np.nonzero(np.isin(self.years, [int(y) for y in years]) & self.present[:, qmask].all(axis=1) & qmask.any())[0]
+        latest = int(in_window[-1]) if len(in_window) else None
+        return {
+            "latest": latest,
+            "quarters": qmask,
+            "first_year": int(complete[0]) if len(complete) else None,
+            "last_year": int(complete[-1]) if len(complete) else None,
+        }
+
+def _state_mask(panel: GrowthPanel, states: list | None) -> np.ndarray:
+    if states is None:
+        return np.ones(len(panel.states), dtype=bool)
+    return np.isin(np.array([str(s).casefold() for s in panel.states]), [str(s).casefold() for s in states])
+
+# One row per state (× group): the latest selected quarter, its QoQ and YoY growth, CAGR between the window's
+# complete years, and the share at either end of that window
+def growth_table(panel: GrowthPanel, years: list, quarters: list, states: list | None = None) -> pd.DataFrame:
+    w = panel.window(years, quarters)
+    n_states, tail = len(panel.states), panel.values.shape[3:]
+    blank = np.full((n_states,) + tail, np.nan)
+    latest = panel.flat[:, w["latest"]] if w["latest"] is not None else blank
+    qoq = panel.qoq()[:, w["latest"]] if w["latest"] is not None else blank
+    yoy = panel.yoy()[:, w["latest"]] if w["latest"] is not None else blank
+    cagr = share_first = share_last = blank
+    if w["first_year"] is not None:
+        yearly = panel.values[:, :, w["quarters"]].sum(axis=2)
+        first, last = yearly[:, w["first_year"]], yearly[:, w["last_year"]]
+        span = panel.years[w["last_year"]] - panel.years[w["first_year"]]
+        if span > 0:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cagr = np.where(first > 0, ((last / first) ** (1 / span) - 1) * 100, np.nan)
+        # Within-state shares for grouped panels, national shares otherwise
+        axis = -1 if panel.groups is not None else 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share_first = first / first.sum(axis=axis, keepdims=True) * 100
+            share_last = last / last.sum(axis=axis, keepdims=True) * 100
+    keep = _state_mask(panel, states)
+    active = np.nan_to_num(panel.flat[:, panel.period_mask(years, quarters)]).sum(axis=1) > 0
+    rows = (keep[:, None] & active) if panel.groups is not None else (keep & active)
+    out = {"State": np.broadcast_to(panel.states[:, None], rows.shape)[rows] if panel.groups is not None else panel.states[rows]}
+    if panel.groups is not None:
+        out["Group"] = np.broadcast_to(panel.groups[None, :], rows.shape)[rows]
+    for name, values in (("Latest", latest), ("QoQ_pct", qoq), ("YoY_pct", yoy), ("CAGR_pct", cagr),
+                         ("Share_first_pct", share_first), ("Share_last_pct", share_last)):
+        out[name] = values[rows]
+    out["Share_shift_pp"] = out["Share_last_pct"] - out["Share_first_pct"]
+    return pd.DataFrame(out)
+
+# State × quarter growth rates ("yoy" or "qoq") over the selected quarters, long format for heatmaps
+def growth_heatmap(panel: GrowthPanel, metric: str, years: list, quarters: list, states: list | None = None) -> pd.DataFrame:
+    if panel.groups is not None:
+        raise ValueError("Heatmaps over quarters are built from ungrouped panels")
+    growth = {"yoy": panel.yoy, "qoq": panel.qoq}[metric]()
+    cells = _state_mask(panel, states)[:, None] & panel.period_mask(years, quarters)[None, :] & ~np.isnan(growth)
+    s, p = np.nonzero(cells)
+    return pd.DataFrame({"State": panel.states[s], "Period": panel.periods[p], "Growth_pct": growth[s, p]})
@@ -0,0 +1,260 @@
+# Parallel ingestion of the PhonePe Pulse JSON tree into typed DataFrames, one per database table
+#
+#   python phonepe_ingest.py path/to/pulse/data --out ingested [--workers 8] [--tables Map_user Top_user ...]
+#   python phonepe_ingest.py path/to/pulse/data --incremental [--manifest ingest_manifest.json]
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from phonepe_bulkload import bulk_engine, frame_records, prepare_table
+from phonepe_schema import SUMMARY_SPECS, TABLE_SCHEMAS, migrate, table_dtypes
+from phonepe_states import canonical_states, state_ids
+from phonepe_summary import refresh_summary
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+BATCH_FILES = 256
+MANIFEST_PATH = "ingest_manifest.json"
+
+def extract_aggre_transaction(data: dict):
+    for i in data.get("transactionData") or []:
+        yield i["name"], i["paymentInstruments"][0]["count"], i["paymentInstruments"][0]["amount"]
+
+def extract_aggre_user(data: dict):
+    for i in data.get("usersByDevice") or []:
+        yield i["brand"], i["count"], i["percentage"]
+
+def extract_map_hover_list(data: dict):
+    for item in data.get("hoverDataList") or []:
+        yield item["name"], item["metric"][0]["count"], item["metric"][0]["amount"]
+
+def extract_map_user(data: dict):
+    for district, value in (data.get("hoverData") or {}).items():
+        yield district, value.get("registeredUsers", 0), value.get("appOpens", 0)
+
+# The Top_* tables keep only the leading district and pincode of each file
+def extract_top_metric(data: dict):
+    d = (data.get("districts") or [None])[0]
+    p = (data.get("pincodes") or [None])[0]
+    yield (
+        d["entityName"] if d else None, d["metric"]["count"] if d else None, d["metric"]["amount"] if d else None,
+        p["entityName"] if p else None, p["metric"]["count"] if p else None, p["metric"]["amount"] if p else None,
+    )
+
+def extract_top_user(data: dict):
+    d = (data.get("districts") or [None])[0]
+    p = (data.get("pincodes") or [None])[0]
+    yield (
+        d["name"] if d else None, d["registeredUsers"] if d else None,
+        p["name"] if p else None, p["registeredUsers"] if p else None,
+    )
+
+# table -> (path under the data root, extractor); column names and dtypes come from phonepe_schema
+DATASETS = {
+    "Aggre_transaction": ("aggregated/transaction", extract_aggre_transaction),
+    "Aggre_user": ("aggregated/user", extract_aggre_user),
+    "Aggre_insurance": ("aggregated/insurance", extract_aggre_transaction),
+    "Map_transaction": ("map/transaction/hover", extract_map_hover_list),
+    "Map_user": ("map/user/hover", extract_map_user),
+    "Map_insurance": ("map/insurance/hover", extract_map_hover_list),
+    "Top_transaction": ("top/transaction", extract_top_metric),
+    "Top_user": ("top/user", extract_top_user),
+    "Top_insurance": ("top/insurance", extract_top_metric),
+}
+
+def with_state_keys(df: pd.DataFrame) -> pd.DataFrame:
+    df["State"] = canonical_states(df["State"].astype(object))
+    df.insert(1, "state_id", state_ids(df["State"]).to_numpy())
+    return df
+
+def state_root(data_root: str, table: str) -> str:
+    return os.path.join(data_root, DATASETS[table][0], "country", "india", "state")
+
+# <state>/<year>/<quarter>.json under each dataset root
+def discover(data_root: str, table: str) -> list:
+    root = state_root(data_root, table)
+    if not os.path.isdir(root):
+        return []
+    files = []
+    for state in sorted(os.scandir(root), key=lambda e: e.name):
+        if not state.is_dir():
+            continue
+        for year in sorted(os.scandir(state.path), key=lambda e: e.name):
+            if year.is_dir():
+                files.extend(sorted(e.path for e in os.scandir(year.path) if e.name.endswith(".json")))
+    return files
+
+def file_keys(path: str) -> tuple:
+    year_dir, name = os.path.split(path)
+    state_dir, year = os.path.split(year_dir)
+    return os.path.basename(state_dir), int(year), int(os.path.splitext(name)[0])
+
+def extract_batch(table: str, files: list) -> pd.DataFrame:
+    _, extract = DATASETS[table]
+    quarter_col, columns = TABLE_SCHEMAS[table]
+    rows = []
+    for path in files:
+        state, year, quarter = file_keys(path)
+        with open(path, "rb") as f:
+            data = _loads(f.read()).get("data") or {}
+        rows.extend((state, year, quarter) + rec for rec in extract(data))
+    df = pd.DataFrame.from_records(rows, columns=["State", "Year", quarter_col] + list(columns))
+    return with_state_keys(df).astype(table_dtypes(table))
+
+def _batches(files: list, size: int):
+    for i in range(0, len(files), size):
+        yield files[i:i + size]
+
+# Yields (table, DataFrame) batches as worker processes finish them
+def iter_batches(data_root: str, tables: list | None = None, workers: int | None = None, batch_files: int = BATCH_FILES, files: dict | None = None):
+    files = files or {t: discover(data_root, t) for t in tables or DATASETS}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(extract_batch, table, batch): table
+            for table, paths in files.items()
+            for batch in _batches(paths, batch_files)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def concat_batches(table: str, batches: list) -> pd.DataFrame:
+    if not batches:
+        return extract_batch(table, [])
+    df = pd.concat(batches, ignore_index=True)
+    df["State"] = canonical_states(df["State"].astype(object))
+    quarter_col = TABLE_SCHEMAS[table][0]
+    return df.astype(table_dtypes(table)).sort_values(["State", "Year", quarter_col], kind="stable", ignore_index=True)
+
+def ingest(data_root: str, tables: list | None = None, workers: int | None = None, batch_files: int = BATCH_FILES) -> dict:
+    tables = tables or list(DATASETS)
+    collected = {t: [] for t in tables}
+    for table, df in iter_batches(data_root, tables, workers, batch_files):
+        collected[table].append(df)
+    return {t: concat_batches(t, batches) for t, batches in collected.items()}
+
+# Incremental mode: a manifest of (size, mtime, sha256) per file decides what needs parsing again
+def load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_manifest(manifest: dict, path: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+# Files whose size and mtime match the manifest are skipped without hashing; a touched but
+# unchanged file only refreshes its manifest entry. Returns (changed files per table, updated entries).
+def changed_files(data_root: str, tables: list, manifest: dict) -> tuple:
+    changed, entries = {}, {}
+    for table in tables:
+        for path in discover(data_root, table):
+            key = os.path.relpath(path, data_root).replace(os.sep, "/")
+            stat = os.stat(path)
+            old = manifest.get(key)
+            if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime:
+                continue
+            digest = file_digest(path)
+            entries[key] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": digest}
+            if not old or old["sha256"] != digest:
+                changed.setdefault(table, []).append(path)
+    return changed, entries
+
+# A Pulse file holds every row of one (State, Year, Quarter) partition, so replacing the partitions of the
+# changed files inside one transaction upserts them by natural key (dimension rows that vanished included)
+# and is safe to re-run. The table's summary partitions are rebuilt in the same transaction.
+def file_partitions(paths: list) -> list:
+    keys = [file_keys(p) for p in paths]
+    states = canonical_states([k[0] for k in keys])
+    return sorted({(str(s), y, q) for s, (_, y, q) in zip(states, keys)})
+
+# Every stored spelling of the partitions' states, so rows kept under a legacy alias ("Andaman And Nicobar") are
+# replaced along with the canonical ones instead of being counted twice
+def stored_partitions(conn, table_name: str, partitions: list) -> list:
+    raw = [r[0] for r in conn.execute(text(f"SELECT DISTINCT State FROM {table_name} WHERE State IS NOT NULL"))]
+    spellings = {}
+    for name, state in zip(raw, canonical_states(raw)):
+        spellings.setdefault(str(state), set()).add(name)
+    return sorted({(name, y, q) for s, y, q in partitions for name in spellings.get(s, set()) | {s}})
+
+def upsert_partitions(engine, table_name: str, df: pd.DataFrame, partitions: list) -> int:
+    quarter_col = TABLE_SCHEMAS[table_name][0]
+    table = prepare_table(engine, table_name, df)
+    delete = text(
+        f"DELETE FROM {table_name} WHERE State = :state AND Year = :year AND {quarter_col} = :quarter"
+    ).bindparams(bindparam("state"), bindparam("year"), bindparam("quarter"))
+    with engine.begin() as conn:
+        stored = stored_partitions(conn, table_name, partitions)
+        if stored:
+            conn.execute(delete, [{"state": s, "year": y, "quarter": q} for s, y, q in stored])
+        if len(df):
+            conn.execute(table.insert(), frame_records(df[[c for c in df.columns if c in table.c]]))
+        if table_name in SUMMARY_SPECS:
+            refresh_summary(conn, table_name, stored)
+    return len(partitions)
+
+def ingest_incremental(engine, data_root: str, manifest_path: str = MANIFEST_PATH, tables: list | None = None,
+                       workers: int | None = None, batch_files: int = BATCH_FILES) -> dict:
+    tables = tables or list(DATASETS)
+    manifest = load_manifest(manifest_path)
+    changed, entries = changed_files(data_root, tables, manifest)
+    collected = {t: [] for t in changed}
+    if changed:
+        for table, df in iter_batches(data_root, workers=workers, batch_files=batch_files, files=changed):
+            collected[table].append(df)
+    summary = {}
+    for table, batches in collected.items():
+        df = concat_batches(table, batches)
+        partitions = file_partitions(changed[table])
+        summary[table] = {"files": len(changed[table]), "rows": len(df), "partitions": upsert_partitions(engine, table, df, partitions)}
+    # Entries are recorded only after every table committed; a failed run simply re-processes the same files
+    manifest.update(entries)
+    save_manifest(manifest, manifest_path)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the PhonePe Pulse JSON tree into Parquet tables")
+    parser.add_argument("data_root", help="the Pulse repository's data/ directory")
+    parser.add_argument("--out", default="ingested", help="output directory for <table>.parquet")
+    parser.add_argument("--tables", nargs="*", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-files", type=int, default=BATCH_FILES)
+    parser.add_argument("--incremental", action="store_true", help="upsert only new or changed files into the database")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if args.incremental:
+        engine = bulk_engine()
+        try:
+            migrate(engine)
+            summary = ingest_incremental(engine, args.data_root, args.manifest, args.tables, args.workers, args.batch_files)
+        finally:
+            engine.dispose()
+        for table, s in summary.items():
+            print(f"{table}: {s['files']} changed files, {s['rows']} rows in {s['partitions']} partitions")
+        print(f"done in {time.perf_counter() - start:.2f}s")
+        return
+    os.makedirs(args.out, exist_ok=True)
+    for table, df in ingest(args.data_root, args.tables, args.workers, args.batch_files).items():
+        df.to_parquet(os.path.join(args.out, f"{table}.parquet"), index=False)
+        print(f"{table}: {len(df)} rows")
+    print(f"done in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
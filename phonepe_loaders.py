@@ -0,0 +1,399 @@
+# Dashboard data layer: schema catalog, per-table cubes and the load_* functions behind every case study.
+# Importable outside `streamlit run` (benchmarks, tools); Streamlit caches fall back to plain in-process caches there.
+import os
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import inspect, text
+
+from phonepe_cube import CUBE_SPECS, cube_from_grouped, query_cube_frame
+from phonepe_db import catalog_schema, create_dashboard_engine, sql_text
+from phonepe_drilldown import DRILL_PAGE_SIZE, empty_page, page_schema, query_district_page
+from phonepe_dtypes import compact, typed
+from phonepe_growth import GROWTH_TABLES, HEATMAP_SCHEMA, GrowthPanel, growth_heatmap, growth_schema, growth_table
+from phonepe_metrics import REGISTRY, instrument_engine, instrumented_cache, timed
+from phonepe_resultcache import cache_key, create_result_cache
+from phonepe_schema import SUMMARY_SPECS, summary_name
+from phonepe_states import INDIA_STATES, state_id
+
+# Cubes and the year/quarter list are rebuilt after CUBE_TTL seconds (phonepe_warmup.py refreshes them ahead of that)
+CUBE_TTL = 600
+# Cubes are built from the ingest-time summary tables when they exist (phonepe_summary.py); 0 reads the raw rows
+USE_SUMMARIES = os.environ.get("PHONEPE_SUMMARY_TABLES", "1") == "1"
+
+# Declared result schemas, column -> kind (see phonepe_dtypes.py)
+YEARS_QUARTERS = {"Year": "year", "Quater": "quarter"}
+STATE_USERS = {"State": "state", "Users": "count", "AppOpens": "count"}
+YEAR_USERS = {"Year": "year", "Users": "count", "AppOpens": "count"}
+BRAND_USERS = {"Brand": "dim", "Users": "count"}
+STATE_INSURANCE = {"State": "state", "Insurance_count": "count", "Insurance_amount": "amount"}
+YEAR_INSURANCE = {"Year": "year", "Insurance_count": "count", "Insurance_amount": "amount"}
+STATE_TRANSACTIONS = {"State": "state", "Transactions": "count", "Amount": "amount"}
+YEAR_TRANSACTIONS = {"Year": "year", "Transactions": "count", "Amount": "amount"}
+STATE_TOP_USERS = {"State": "state", "TopUsers": "count"}
+YEAR_TOP_USERS = {"Year": "year", "TopUsers": "count"}
+STATE_CATEGORIES = {"State": "state", "Category": "dim", "Txn_count": "count", "Txn_amount": "amount"}
+STATE_TXN_TOTALS = {"State": "state", "Txn_count": "count", "Txn_amount": "amount"}
+YEAR_CATEGORIES = {"Year": "year", "Category": "dim", "Txn_amount": "amount"}
+CATEGORY_TOTALS = {"Category": "dim", "Txn_count": "count", "Txn_amount": "amount"}
+
+@st.cache_resource
+def get_engine():
+    return instrument_engine(create_dashboard_engine())
+
+@instrumented_cache("years_quarters", st.cache_data(ttl=CUBE_TTL))
+@typed(YEARS_QUARTERS)
+def load_years_quarters():
+    q = text(f"SELECT DISTINCT Year, Quater FROM {cube_source('Aggre_transaction')[0]} ORDER BY Year, Quater;")
+    with get_engine().connect() as conn:
+        df = pd.read_sql_query(q, conn)
+    return df
+
+# Latest Year/Quarter present; shared result-cache entries from an older version are ignored
+def data_version() -> str:
+    yq = load_years_quarters()
+    if yq.empty:
+        return "empty"
+    latest = yq.sort_values(["Year", "Quater"]).iloc[-1]
+    return f"{int(latest['Year'])}Q{int(latest['Quater'])}"
+
+# Cross-process store for the cube GROUP BY results (PHONEPE_RESULT_CACHE); None keeps everything in process
+@st.cache_resource
+def get_result_cache():
+    return create_result_cache()
+
+# Schema catalog: every table the dashboard reads and the candidate column names per logical field.
+# Each entry is (candidates, fallback); a fallback of None marks the field as required.
+SCHEMA_TTL = 3600
+TABLE_COLUMNS = {
+    "Aggre_transaction": {
+        "state": (["state", "State"], "State"),
+        "year": (["year", "Year"], "Year"),
+        "quarter": (["quater", "Quater"], "Quater"),
+        "type": (["Transaction_type", "transaction_type", "transactionType"], "Transaction_type"),
+        "count": (["Transaction_count", "transaction_count", "transactionCount"], None),
+        "amount": (["Transaction_amount", "transaction_amount", "transactionAmount"], None),
+    },
+    "Aggre_user": {
+        "state": (["state", "State"], "State"),
+        "year": (["year", "Year"], "Year"),
+        "quarter": (["quater", "Quater"], "Quater"),
+        "brand": (["brand", "Brand"], "Brand"),
+        "count": (["count", "Count"], None),
+    },
+    "Map_user": {
+        "state": (["state", "State"], "State"),
+        "year": (["year", "Year"], "Year"),
+        "quarter": (["quarter", "Quarter"], "Quarter"),
+        "users": (["registeredUsers", "registered_users", "Registered_users", "RegisteredUsers"], None),
+        "opens": (["number_appOpens", "appOpens", "app_opens", "App_opens", "AppOpens"], None),
+        "district": (["users_district_name", "district_name", "District_name", "district", "District"], None),
+    },
+    "Map_insurance": {
+        "state": (["state", "State"], "State"),
+        "year": (["year", "Year"], "Year"),
+        "quarter": (["quarter", "Quarter"], "Quarter"),
+        "count": (["insurance_count", "Insurance_count", "transaction_count", "transactionCount"], None),
+        "amount": (["insurance_amount", "Insurance_amount", "transaction_amount", "transactionAmount"], None),
+        "district": (["insurance_district_name", "district_name", "District_name", "district", "District"], None),
+    },
+    "Map_transaction": {
+        "state": (["state", "State"], "State"),
+        "year": (["year", "Year"], "Year"),
+        "quarter": (["quarter", "Quarter"], "Quarter"),
+        "count": (["Transaction_count", "transaction_count", "transactionCount"], None),
+        "amount": (["Transaction_amount", "transaction_amount", "transactionAmount"], None),
+        "district": (["Transaction_district_name", "district_name", "District_name", "district", "District"], None),
+    },
+    "Top_user": {
+        "state": (["state", "State"], "State"),
+        "year": (["year", "Year"], "Year"),
+        "quarter": (["quater", "Quater", "quarter", "Quarter"], "Quarter"),
+        "users": (["district_registeredUsers", "registeredUsers", "registered_users", "Registered_users", "RegisteredUsers"], None),
+        "district": (["district_name", "District_name", "district_entityName", "district", "District"], None),
+    },
+    "Top_insurance": {
+        "state": (["state", "State"], "State"),
+        "year": (["year", "Year"], "Year"),
+        "quarter": (["quarter", "Quarter"], "Quarter"),
+        "count": (["district_count", "insurance_count", "transaction_count", "transactionCount"], None),
+        "amount": (["district_amount", "insurance_amount", "transaction_amount", "transactionAmount"], None),
+        "district": (["district_entityName", "district_name", "District_name", "district", "District"], None),
+    },
+}
+
+# Summaries keep their source's column names and add row_count; they are only catalogued when present
+SUMMARY_COLUMNS = {
+    summary_name(t): {**TABLE_COLUMNS[t], "rows": (["row_count"], None)} for t in SUMMARY_SPECS if t in TABLE_COLUMNS
+}
+CATALOG_TABLES = {**TABLE_COLUMNS, **SUMMARY_COLUMNS}
+
+def match_column(cols: list, candidates: list) -> str | None:
+    cols_lower = {c.lower(): c for c in cols}
+    for cand in candidates:
+        if cand.lower() in cols_lower:
+            return cols_lower[cand.lower()]
+    return None
+
+# SQLite stand-ins have no information_schema; their columns come from the inspector instead
+def _catalog_rows(engine) -> list:
+    if engine.dialect.name == "sqlite":
+        insp = inspect(engine)
+        wanted = {t.lower() for t in CATALOG_TABLES}
+        return [(t, c["name"]) for t in insp.get_table_names() if t.lower() in wanted for c in insp.get_columns(t)]
+    sql = sql_text(
+        "SELECT table_name, column_name FROM information_schema.columns "
+        "WHERE table_schema = :schema AND table_name IN :tables"
+    )
+    with engine.connect() as conn:
+        return conn.execute(sql, {"schema": catalog_schema(engine), "tables": tuple(CATALOG_TABLES)}).fetchall()
+
+# One information_schema round trip for all tables; resolved mappings live for SCHEMA_TTL seconds
+@instrumented_cache("schema_catalog", st.cache_resource(ttl=SCHEMA_TTL))
+@timed("metadata")
+def load_schema_catalog() -> dict:
+    res = _catalog_rows(get_engine())
+    raw = {}
+    for table_name, column_name in res:
+        raw.setdefault(table_name.lower(), []).append(column_name)
+    catalog = {}
+    for table, fields in CATALOG_TABLES.items():
+        cols = raw.get(table.lower(), [])
+        if table in SUMMARY_COLUMNS and not cols:
+            continue
+        resolved = {field: match_column(cols, cands) or fallback for field, (cands, fallback) in fields.items()}
+        catalog[table] = {"columns": cols, "resolved": resolved}
+    return catalog
+
+def invalidate_schema_catalog():
+    load_schema_catalog.clear()
+
+def table_columns(table: str) -> dict:
+    return load_schema_catalog()[table]["resolved"]
+
+# The table a cube of `table` is read from, with its resolved columns: the summary when it has every field, else the table
+def cube_source(table: str) -> tuple:
+    entry = load_schema_catalog().get(summary_name(table)) if USE_SUMMARIES else None
+    dims, measures = CUBE_SPECS[table]
+    if entry and all(entry["resolved"].get(f) for f in dims + measures + ["rows"]):
+        return summary_name(table), entry["resolved"]
+    return table, table_columns(table)
+
+# Data loading functions: each table is aggregated once at State × Year × Quarter grain and sliced in memory
+@instrumented_cache("cube", st.cache_resource(ttl=CUBE_TTL))
+@timed("aggregate", "load_cube")
+def get_cube(table: str):
+    source, cols = cube_source(table)
+    source = source if source != table else None
+    cache = get_result_cache()
+    if cache is None:
+        return cube_from_grouped(table, query_cube_frame(get_engine(), table, cols, source))
+    key, version = cache_key("cube", table, cols), data_version()
+    df = cache.get(key, version)
+    REGISTRY.record_cache("result_cache", df is not None)
+    if df is None:
+        df = query_cube_frame(get_engine(), table, cols, source)
+        cache.put(key, version, df)
+    return cube_from_grouped(table, df)
+
+@timed("loader")
+@typed(STATE_USERS)
+def load_user_statewise(years: list, quarters: list, states: list):
+    cols = table_columns('Map_user')
+    if not cols['users'] or not cols['opens']:
+        st.warning(f"Columns not found in Map_user: users_col={cols['users']}, opens_col={cols['opens']}")
+        return pd.DataFrame(columns=['State', 'Users', 'AppOpens'])
+    df = get_cube('Map_user').slice(["state"], year=years, quarter=quarters, state=states)
+    return df.rename(columns={"state": "State", "users": "Users", "opens": "AppOpens"})
+
+@timed("loader")
+@typed(YEAR_USERS)
+def load_user_yearly(quarters: list):
+    cols = table_columns('Map_user')
+    if not cols['users'] or not cols['opens']:
+        st.warning(f"Columns not found in Map_user: users_col={cols['users']}, opens_col={cols['opens']}")
+        return pd.DataFrame(columns=['Year', 'Users', 'AppOpens'])
+    df = get_cube('Map_user').slice(["year"], quarter=quarters)
+    return df.rename(columns={"year": "Year", "users": "Users", "opens": "AppOpens"})
+
+@timed("loader")
+@typed(BRAND_USERS)
+def load_user_brand(state: str | None, years: list, quarters: list):
+    cols = table_columns('Aggre_user')
+    if not cols['count']:
+        st.warning(f"Column not found in Aggre_user: count_col={cols['count']}")
+        return pd.DataFrame(columns=['Brand', 'Users'])
+    df = get_cube('Aggre_user').slice(["brand"], year=years, quarter=quarters, state=[state] if state else None)
+    return df.rename(columns={"brand": "Brand", "count": "Users"})
+
+@timed("loader")
+@typed(STATE_INSURANCE)
+def load_insurance_statewise(years: list, quarters: list, states: list):
+    cols = table_columns('Map_insurance')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Map_insurance: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['State', 'Insurance_count', 'Insurance_amount'])
+    df = get_cube('Map_insurance').slice(["state"], year=years, quarter=quarters, state=states)
+    return df.rename(columns={"state": "State", "count": "Insurance_count", "amount": "Insurance_amount"})
+
+@timed("loader")
+@typed(YEAR_INSURANCE)
+def load_insurance_yearly(quarters: list):
+    cols = table_columns('Map_insurance')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Map_insurance: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['Year', 'Insurance_count', 'Insurance_amount'])
+    df = get_cube('Map_insurance').slice(["year"], quarter=quarters)
+    return df.rename(columns={"year": "Year", "count": "Insurance_count", "amount": "Insurance_amount"})
+
+@timed("loader")
+@typed(STATE_INSURANCE)
+def load_insurance_engagement_statewise(years: list, quarters: list, states: list):
+    cols = table_columns('Top_insurance')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Top_insurance: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['State', 'Insurance_count', 'Insurance_amount'])
+    df = get_cube('Top_insurance').slice(["state"], year=years, quarter=quarters, state=states)
+    return df.rename(columns={"state": "State", "count": "Insurance_count", "amount": "Insurance_amount"})
+
+@timed("loader")
+@typed(YEAR_INSURANCE)
+def load_insurance_engagement_yearly(quarters: list):
+    cols = table_columns('Top_insurance')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Top_insurance: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['Year', 'Insurance_count', 'Insurance_amount'])
+    df = get_cube('Top_insurance').slice(["year"], quarter=quarters)
+    return df.rename(columns={"year": "Year", "count": "Insurance_count", "amount": "Insurance_amount"})
+
+@timed("loader")
+@typed(STATE_TRANSACTIONS)
+def load_tran_statewise_from_map(years: list, quarters: list, states: list):
+    cols = table_columns('Map_transaction')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Map_transaction: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['State', 'Transactions', 'Amount'])
+    df = get_cube('Map_transaction').slice(["state"], year=years, quarter=quarters, state=states)
+    return df.rename(columns={"state": "State", "count": "Transactions", "amount": "Amount"})
+
+@timed("loader")
+@typed(YEAR_TRANSACTIONS)
+def load_tran_yearly_from_map(quarters: list):
+    cols = table_columns('Map_transaction')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Map_transaction: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['Year', 'Transactions', 'Amount'])
+    df = get_cube('Map_transaction').slice(["year"], quarter=quarters)
+    return df.rename(columns={"year": "Year", "count": "Transactions", "amount": "Amount"})
+
+@timed("loader")
+@typed(STATE_TOP_USERS)
+def load_top_user_statewise(years: list, quarters: list, states: list):
+    cols = table_columns('Top_user')
+    if not cols['users']:
+        st.warning(f"Column not found in Top_user: users_col={cols['users']}")
+        return pd.DataFrame(columns=['State', 'TopUsers'])
+    df = get_cube('Top_user').slice(["state"], year=years, quarter=quarters, state=states)
+    return df.rename(columns={"state": "State", "users": "TopUsers"})
+
+@timed("loader")
+@typed(YEAR_TOP_USERS)
+def load_top_user_yearly(quarters: list):
+    cols = table_columns('Top_user')
+    if not cols['users']:
+        st.warning(f"Column not found in Top_user: users_col={cols['users']}")
+        return pd.DataFrame(columns=['Year', 'TopUsers'])
+    df = get_cube('Top_user').slice(["year"], quarter=quarters)
+    return df.rename(columns={"year": "Year", "users": "TopUsers"})
+
+# State × Category split and per-state totals from one pass over the filtered cube
+@timed("loader")
+@typed(STATE_CATEGORIES, STATE_TXN_TOTALS)
+def load_payment_categories_rollup(years: list, quarters: list, states: list):
+    cols = table_columns('Aggre_transaction')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Aggre_transaction: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['State', 'Category', 'Txn_count', 'Txn_amount']), pd.DataFrame(columns=['State', 'Txn_count', 'Txn_amount'])
+    names = {"state": "State", "type": "Category", "count": "Txn_count", "amount": "Txn_amount"}
+    by_category, by_state = get_cube('Aggre_transaction').rollup([["state", "type"], ["state"]], year=years, quarter=quarters, state=states)
+    return by_category.rename(columns=names), by_state.rename(columns=names)
+
+@timed("loader")
+@typed(YEAR_CATEGORIES)
+def load_payment_categories_yearly(quarters: list, states: list):
+    cols = table_columns('Aggre_transaction')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Aggre_transaction: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['Year', 'Category', 'Txn_amount'])
+    df = get_cube('Aggre_transaction').slice(["year", "type"], quarter=quarters, state=states)
+    return df.rename(columns={"year": "Year", "type": "Category", "amount": "Txn_amount"})[['Year', 'Category', 'Txn_amount']]
+
+@timed("loader")
+@typed(CATEGORY_TOTALS)
+def load_payment_categories_overall(years: list, quarters: list):
+    cols = table_columns('Aggre_transaction')
+    if not cols['count'] or not cols['amount']:
+        st.warning(f"Columns not found in Aggre_transaction: cnt_col={cols['count']}, amt_col={cols['amount']}")
+        return pd.DataFrame(columns=['Category', 'Txn_count', 'Txn_amount'])
+    df = get_cube('Aggre_transaction').slice(["type"], year=years, quarter=quarters)
+    return df.rename(columns={"type": "Category", "count": "Txn_count", "amount": "Txn_amount"})
+
+# Raw spellings of `states` stored in `table` (from its cached cube), for filtering on the state column in SQL;
+# None when every state is selected
+def state_spellings(table: str, states: list | None) -> list | None:
+    if states is None or set(states) >= set(INDIA_STATES):
+        return None
+    spellings = get_cube(table).spellings
+    return [raw for s in states for raw in spellings.get(s, [s])]
+
+# One page of a state's districts ranked by `rank_by`, fetched with LIMIT and a keyset cursor. The state's raw
+# spellings come from its cached cube; the indexed state_id column is matched too when the table has one.
+@instrumented_cache("district_page", st.cache_data(ttl=CUBE_TTL))
+@timed("loader")
+def load_district_page(table: str, state: str, years: list, quarters: list, rank_by: str, after: tuple | None = None,
+                       page_size: int = DRILL_PAGE_SIZE):
+    cols = table_columns(table)
+    if not cols.get('district'):
+        st.warning(f"District column not found in {table}")
+        return compact(empty_page(table), page_schema(table)), False
+    has_key = "state_id" in {c.lower() for c in load_schema_catalog()[table]["columns"]}
+    key = state_id(state) if has_key and state in INDIA_STATES else None
+    spellings = get_cube(table).spellings.get(state, [state])
+    page, more = query_district_page(get_engine(), table, cols, years, quarters, rank_by, spellings, key, after, page_size)
+    return compact(page, page_schema(table)), more
+
+# Growth panels: each table and measure laid out once on a calendar State × Year × Quarter array. `version` is
+# part of the cache key only, so new data gets a new panel.
+@instrumented_cache("growth_panel", st.cache_resource(ttl=CUBE_TTL))
+@timed("aggregate", "growth_panel")
+def get_growth_panel(table: str, measure: str, version: str):
+    group = GROWTH_TABLES[table][0]
+    return GrowthPanel.from_cube(get_cube(table), measure, group[0] if group else None)
+
+@instrumented_cache("growth", st.cache_data(ttl=CUBE_TTL))
+def _growth_table(version: str, table: str, measure: str, years: list, quarters: list, states: list):
+    group = GROWTH_TABLES[table][0]
+    df = growth_table(get_growth_panel(table, measure, version), years, quarters, states)
+    return compact(df.rename(columns={"Group": group[1]}) if group else df, growth_schema(table))
+
+@instrumented_cache("growth_heatmap", st.cache_data(ttl=CUBE_TTL))
+def _growth_heatmap(version: str, table: str, measure: str, metric: str, years: list, quarters: list, states: list):
+    return compact(growth_heatmap(get_growth_panel(table, measure, version), metric, years, quarters, states), HEATMAP_SCHEMA)
+
+# QoQ, YoY, CAGR and share shift of `measure` for every selected state (× category or brand), cached per data version
+@timed("loader")
+def load_growth(table: str, measure: str, years: list, quarters: list, states: list):
+    cols = table_columns(table)
+    if not cols.get(measure):
+        st.warning(f"Column not found in {table}: {measure}_col={cols.get(measure)}")
+        return compact(pd.DataFrame(columns=list(growth_schema(table))), growth_schema(table))
+    return _growth_table(data_version(), table, measure, years, quarters, states)
+
+# State × quarter QoQ or YoY growth ("qoq"/"yoy") of an ungrouped table, long format
+@timed("loader")
+def load_growth_heatmap(table: str, measure: str, metric: str, years: list, quarters: list, states: list):
+    cols = table_columns(table)
+    if not cols.get(measure):
+        st.warning(f"Column not found in {table}: {measure}_col={cols.get(measure)}")
+        return compact(pd.DataFrame(columns=list(HEATMAP_SCHEMA)), HEATMAP_SCHEMA)
+    return _growth_heatmap(data_version(), table, measure, metric, years, quarters, states)
@@ -0,0 +1,357 @@
+# Concurrent-session load test: N simulated analysts drive the real dashboard script through Streamlit's AppTest in
+# one process, against the synthetic stand-in (phonepe_synth.py). Every session walks the case studies with random
+# Year/Quarter/State filters; the run reports throughput, render latency percentiles, connection-pool wait and peak RSS.
+#
+#   python phonepe_loadtest.py --sessions 1 4 8 16 --renders 12 --out loadtest_results.json
+#   python phonepe_loadtest.py --sessions 8 --pool-size 3 --max-overflow 0 --max-p95 5
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+from sqlalchemy.pool import QueuePool
+
+from phonepe_bench import APP_PATH, clear_data_caches, environment, use_standin
+from phonepe_synth import SCALES, dataset_paths, prepare, resolve_scale
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Chance that a session keeps every state selected; otherwise it picks a handful
+ALL_STATES_SHARE = 0.5
+MAX_PICKED_STATES = 8
+
+def rss_bytes() -> int | None:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# Process-wide high-water mark (kilobytes on Linux, bytes on macOS)
+def max_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    a = np.asarray(samples, dtype=float)
+    out = {"count": len(a), "mean": round(float(a.mean()), 6), "max": round(float(a.max()), 6)}
+    out.update({f"p{q}": round(float(np.percentile(a, q)), 6) for q in (50, 90, 95, 99)})
+    return out
+
+def _mb(nbytes: int | None) -> float | None:
+    return None if nbytes is None else round(nbytes / 2**20, 1)
+
+# Times every pool checkout of the dashboard engine (waiting for a free connection, opening one, the pre-ping)
+# and, for queue pools, how many connections were checked out at once
+class PoolProbe:
+    def __init__(self, engine):
+        self.pool = engine.pool
+        self.lock = threading.Lock()
+        self.connect = self.pool.connect
+        self.pool.connect = self.timed_connect
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.waits = []
+            self.peak = 0
+
+    def timed_connect(self):
+        start = time.perf_counter()
+        conn = self.connect()
+        wait = time.perf_counter() - start
+        checked_out = self.pool.checkedout() if isinstance(self.pool, QueuePool) else None
+        with self.lock:
+            self.waits.append(wait)
+            self.peak = max(self.peak, checked_out or 0)
+        return conn
+
+    def close(self):
+        self.pool.connect = self.connect
+
+# AppTest installs a mock Streamlit Runtime for every run and clears it when the run ends, which breaks runs still in
+# flight on other sessions' threads. Here the first runtime stays installed and is shared, as the sessions of one
+# server process share the real one. That relies on Streamlit internals (Runtime._instance and the Runtime name in
+# streamlit.testing.v1.app_test), so only the versions this was checked against are accepted.
+STREAMLIT_VERSIONS = ((1, 28), (1, 66))
+
+def check_streamlit():
+    import streamlit
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+
+    version = tuple(int(p) for p in streamlit.__version__.split(".")[:2] if p.isdigit())
+    low, high = STREAMLIT_VERSIONS
+    if not low <= version <= high:
+        raise RuntimeError(f"streamlit {streamlit.__version__} is not supported by the shared-runtime load test; "
+                           f"install a version from {'.'.join(map(str, low))} to {'.'.join(map(str, high))}.x "
+                           "or re-check _SharedRuntimeSlot against it and widen STREAMLIT_VERSIONS")
+    if "_instance" not in vars(Runtime) or getattr(app_test, "Runtime", None) is not Runtime:
+        raise RuntimeError(f"streamlit {streamlit.__version__} no longer exposes Runtime._instance to AppTest")
+
+class _SharedRuntimeSlot(type):
+    @property
+    def _instance(cls):
+        from streamlit.runtime import Runtime
+        return Runtime._instance
+
+    @_instance.setter
+    def _instance(cls, value):
+        from streamlit.runtime import Runtime
+        if value is not None and Runtime._instance is None:
+            Runtime._instance = value
+
+@contextlib.contextmanager
+def shared_runtime():
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+
+    check_streamlit()
+    shared = _SharedRuntimeSlot("SharedRuntime", (Runtime,), {})
+    with mock.patch.object(app_test, "Runtime", shared):
+        try:
+            yield
+        finally:
+            Runtime._instance = None
+
+class RssSampler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = []
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.loop, name="rss-sampler", daemon=True)
+
+    def loop(self):
+        while True:
+            rss = rss_bytes()
+            if rss is not None:
+                self.samples.append(rss)
+            if self.done.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.done.set()
+        self.thread.join()
+
+def _pick(rng, values: list, most: int) -> list:
+    k = int(rng.integers(1, min(most, len(values)) + 1))
+    return sorted(rng.choice(values, size=k, replace=False).tolist(), key=values.index)
+
+# Random sidebar selection: non-empty year and quarter subsets, all states or a few of them
+def random_filters(rng, years: list, quarters: list, states: list) -> dict:
+    picked = list(states) if rng.random() < ALL_STATES_SHARE else _pick(rng, states, MAX_PICKED_STATES)
+    return {"years": _pick(rng, years, len(years)), "quarters": _pick(rng, quarters, len(quarters)), "states": picked}
+
+# One simulated analyst: lands on the dashboard, then renders `renders` pages, visiting the case studies in a
+# fresh random order every cycle
+def run_session(index: int, seed: int, renders: int, think: float, start_at: float, results: list, timeout: float):
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng([seed, index])
+    samples, errors = [], []
+
+    def render(case: str, step):
+        start = time.perf_counter()
+        try:
+            step()
+            failed = at.exception[0].message if at.exception else None
+        except Exception as e:
+            failed = f"{type(e).__name__}: {e}"
+        samples.append({"case": case, "seconds": time.perf_counter() - start, "error": failed})
+        if failed:
+            errors.append(failed)
+
+    time.sleep(max(0.0, start_at - time.perf_counter()))
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    render("(landing)", at.run)
+    if at.exception or not at.sidebar.selectbox:
+        results.append({"session": index, "renders": samples, "errors": errors})
+        return
+    cases = list(at.sidebar.selectbox[0].options)
+    # The filters start fully selected, so their values are every option
+    years, quarters, states = (list(w.value) for w in at.sidebar.multiselect[:3])
+    order = []
+    for _ in range(renders):
+        if not order:
+            order = rng.permutation(cases).tolist()
+        case = order.pop()
+        f = random_filters(rng, years, quarters, states)
+
+        def step():
+            at.sidebar.multiselect[0].set_value(f["years"])
+            at.sidebar.multiselect[1].set_value(f["quarters"])
+            at.sidebar.multiselect[2].set_value(f["states"])
+            at.sidebar.selectbox[0].select(case).run()
+
+        render(case, step)
+        if think:
+            time.sleep(float(rng.exponential(think)))
+    results.append({"session": index, "renders": samples, "errors": errors})
+
+def run_level(sessions: int, args, probe: PoolProbe) -> dict:
+    from phonepe_metrics import REGISTRY
+
+    if not args.warm:
+        clear_data_caches()
+    REGISTRY.reset()
+    probe.reset()
+    results = []
+    start = time.perf_counter()
+    rss_start = rss_bytes()
+    stagger = args.ramp / sessions if sessions > 1 else 0.0
+    threads = [
+        threading.Thread(target=run_session, name=f"session-{i}",
+                         args=(i, args.seed, args.renders, args.think, start + i * stagger, results, args.timeout))
+        for i in range(sessions)
+    ]
+    with shared_runtime(), RssSampler(args.sample_interval) as sampler:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    wall = time.perf_counter() - start
+    renders = [r for s in results for r in s["renders"]]
+    ok = [r["seconds"] for r in renders if not r["error"]]
+    by_case = {}
+    for r in renders:
+        if not r["error"]:
+            by_case.setdefault(r["case"], []).append(r["seconds"])
+    caches = REGISTRY.cache_summary()
+    hits, lookups = int(caches["hits"].sum()), int((caches["hits"] + caches["misses"]).sum())
+    errors = [e for s in results for e in s["errors"]]
+    return {
+        "sessions": sessions,
+        "renders": len(renders),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(ok) / wall, 3) if wall else None,
+        "latency_s": percentiles(ok),
+        "latency_by_case_s": {case: percentiles(v) for case, v in sorted(by_case.items())},
+        "pool": {
+            "size": probe.pool.size() if isinstance(probe.pool, QueuePool) else None,
+            "peak_checked_out": probe.peak,
+            "checkout_wait_s": percentiles(probe.waits),
+            "total_wait_s": round(float(sum(probe.waits)), 6),
+        },
+        "memory_mb": {
+            "rss_start": _mb(rss_start),
+            "rss_peak": _mb(max(sampler.samples, default=None)),
+            "rss_end": _mb(rss_bytes()),
+            "process_peak": _mb(max_rss_bytes()),
+        },
+        "cache_hit_ratio": round(hits / lookups, 4) if lookups else None,
+    }
+
+def run(args) -> dict:
+    scale = resolve_scale(args.scale, **{dim: getattr(args, dim) for dim in SCALES["small"]})
+    paths = dataset_paths(args.data)
+    use_standin(paths, args.backend)
+    if args.pool_size is not None:
+        os.environ["PHONEPE_DB_POOL_SIZE"] = str(args.pool_size)
+    if args.max_overflow is not None:
+        os.environ["PHONEPE_DB_MAX_OVERFLOW"] = str(args.max_overflow)
+    prepare(args.data, scale, args.seed, args.workers)
+    from phonepe_db import DB_MAX_OVERFLOW, DB_POOL_SIZE
+    from phonepe_loaders import get_engine
+
+    probe = PoolProbe(get_engine())
+    levels = []
+    try:
+        for sessions in args.sessions:
+            level = run_level(sessions, args, probe)
+            levels.append(level)
+            lat, pool, mem = level["latency_s"], level["pool"], level["memory_mb"]
+            print(f"{sessions:>3} sessions: {level['renders']} renders, {level['errors']} errors, "
+                  f"{level['throughput_rps']} renders/s, p50 {lat.get('p50', 0) * 1e3:.0f}ms p95 {lat.get('p95', 0) * 1e3:.0f}ms "
+                  f"p99 {lat.get('p99', 0) * 1e3:.0f}ms, pool wait p95 {pool['checkout_wait_s'].get('p95', 0) * 1e3:.1f}ms "
+                  f"(peak {pool['peak_checked_out']} checked out), peak RSS {mem['rss_peak']} MB", file=sys.stderr)
+    finally:
+        probe.close()
+    return {
+        "meta": dict(environment(), created_at=time.strftime("%Y-%m-%d %H:%M:%S"), backend=args.backend, scale=scale,
+                     seed=args.seed, renders=args.renders, think=args.think, ramp=args.ramp, warm=args.warm,
+                     pool_size=DB_POOL_SIZE if args.backend != "snapshot" else None,
+                     max_overflow=DB_MAX_OVERFLOW if args.backend != "snapshot" else None),
+        "levels": levels,
+    }
+
+# Levels breaking the --max-* limits
+def violations(doc: dict, max_p95: float | None, max_pool_wait: float | None, max_errors: int) -> list:
+    out = []
+    for level in doc["levels"]:
+        n = level["sessions"]
+        if level["errors"] > max_errors:
+            out.append(f"{n} sessions: {level['errors']} failed renders")
+        p95 = level["latency_s"].get("p95")
+        if max_p95 is not None and p95 is not None and p95 > max_p95:
+            out.append(f"{n} sessions: render p95 {p95:.3f}s over {max_p95}s")
+        wait = level["pool"]["checkout_wait_s"].get("p95")
+        if max_pool_wait is not None and wait is not None and wait > max_pool_wait:
+            out.append(f"{n} sessions: pool wait p95 {wait:.3f}s over {max_pool_wait}s")
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent dashboard sessions against the synthetic stand-in")
+    parser.add_argument("--sessions", nargs="*", type=int, default=[1, 4, 8], help="concurrent sessions, one run per value")
+    parser.add_argument("--renders", type=int, default=12, help="page renders per session after landing")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between a session's renders, in seconds")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which session starts are spread")
+    parser.add_argument("--warm", action="store_true", help="keep the data caches between levels")
+    parser.add_argument("--pool-size", type=int, default=None)
+    parser.add_argument("--max-overflow", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds one render may take before it fails")
+    parser.add_argument("--sample-interval", type=float, default=0.05, help="RSS sampling period, in seconds")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for dim in SCALES["small"]:
+        parser.add_argument(f"--{dim}", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", default="bench_data", help="directory for the generated tree, tables and stand-in")
+    parser.add_argument("--backend", choices=["sqlite", "snapshot"], default="sqlite")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="loadtest_results.json")
+    parser.add_argument("--max-p95", type=float, default=None, help="fail when a level's render p95 exceeds this many seconds")
+    parser.add_argument("--max-pool-wait", type=float, default=None, help="fail when a level's pool-wait p95 exceeds this many seconds")
+    parser.add_argument("--max-errors", type=int, default=0, help="failed renders tolerated per level")
+    args = parser.parse_args()
+    # AppTest sessions run without a Streamlit server; its bare-mode warnings would drown the progress lines
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    try:
+        check_streamlit()
+    except RuntimeError as e:
+        sys.exit(f"error: {e}")
+    doc = run(args)
+    with open(args.out, "w") as f:
+        json.dump(doc, f, indent=1)
+    print(f"{len(doc['levels'])} levels written to {args.out}")
+    problems = violations(doc, args.max_p95, args.max_pool_wait, args.max_errors)
+    for p in problems:
+        print(f"FAIL {p}")
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
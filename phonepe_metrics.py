@@ -0,0 +1,202 @@
+# Hot-path instrumentation: wall time, rows/bytes and cache hits per SQL statement, loader, figure build and page.
+# Samples stay in process (bounded per series) and are exported as Prometheus text or JSON log lines.
+#
+#   PHONEPE_METRICS_LOG=1         one JSON line per span on the "phonepe.metrics" logger
+#   PHONEPE_METRICS_TEXTFILE=path  Prometheus text rewritten after every page run (node_exporter textfile collector)
+#   PHONEPE_DIAGNOSTICS=1          diagnostics panel in the dashboard sidebar (or ?diagnostics=1)
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import event
+
+METRICS_LOG = os.environ.get("PHONEPE_METRICS_LOG", "0") == "1"
+METRICS_TEXTFILE = os.environ.get("PHONEPE_METRICS_TEXTFILE")
+DIAGNOSTICS = os.environ.get("PHONEPE_DIAGNOSTICS", "0") == "1"
+# Latency samples kept per series for the quantiles
+WINDOW = 2048
+
+# The case study being rendered; copied into page-fetch worker threads with the rest of the context
+CASE = contextvars.ContextVar("phonepe_case", default="")
+
+logger = logging.getLogger("phonepe.metrics")
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Prometheus label set
+def labels(**kv) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in kv.items()) + "}"
+
+class Registry:
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.series = {}
+        self.caches = {}
+
+    def record(self, kind: str, name: str, seconds: float, rows: int | None = None, nbytes: int | None = None, case: str | None = None):
+        case = CASE.get() if case is None else case
+        with self.lock:
+            s = self.series.get((kind, name, case))
+            if s is None:
+                s = self.series[(kind, name, case)] = {"samples": deque(maxlen=self.window), "count": 0, "sum": 0.0, "rows": 0, "bytes": 0}
+            s["samples"].append(seconds)
+            s["count"] += 1
+            s["sum"] += seconds
+            s["rows"] += rows or 0
+            s["bytes"] += nbytes or 0
+        if METRICS_LOG:
+            logger.info(json.dumps({"kind": kind, "name": name, "case": case, "seconds": round(seconds, 6), "rows": rows, "bytes": nbytes}))
+
+    def record_cache(self, name: str, hit: bool):
+        with self.lock:
+            c = self.caches.setdefault(name, {"hit": 0, "miss": 0})
+            c["hit" if hit else "miss"] += 1
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+            self.caches.clear()
+
+    def summary(self) -> pd.DataFrame:
+        with self.lock:
+            items = [(k, list(s["samples"]), s["count"], s["rows"], s["bytes"]) for k, s in self.series.items()]
+        rows = []
+        for (kind, name, case), samples, count, n_rows, n_bytes in items:
+            a = np.asarray(samples)
+            rows.append({"kind": kind, "name": name, "case": case, "count": count,
+                         "p50_ms": float(np.percentile(a, 50)) * 1e3, "p95_ms": float(np.percentile(a, 95)) * 1e3,
+                         "rows": n_rows, "bytes": n_bytes})
+        columns = ["kind", "name", "case", "count", "p50_ms", "p95_ms", "rows", "bytes"]
+        return pd.DataFrame(rows, columns=columns).sort_values(["kind", "p95_ms"], ascending=[True, False], ignore_index=True)
+
+    def cache_summary(self) -> pd.DataFrame:
+        with self.lock:
+            rows = [{"cache": name, "hits": c["hit"], "misses": c["miss"]} for name, c in self.caches.items()]
+        df = pd.DataFrame(rows, columns=["cache", "hits", "misses"])
+        df["hit_ratio"] = df["hits"] / (df["hits"] + df["misses"]).where(lambda t: t > 0)
+        return df
+
+    def prometheus_text(self) -> str:
+        with self.lock:
+            items = [(k, list(s["samples"]), s["count"], s["sum"], s["rows"], s["bytes"]) for k, s in self.series.items()]
+            caches = {name: dict(c) for name, c in self.caches.items()}
+        lines = [
+            "# HELP phonepe_span_seconds Wall time of instrumented spans (quantiles over the last samples)",
+            "# TYPE phonepe_span_seconds summary",
+        ]
+        for (kind, name, case), samples, count, total, _, _ in items:
+            for q in (0.5, 0.95):
+                lines.append(f"phonepe_span_seconds{labels(kind=kind, name=name, case=case, quantile=q)} {np.quantile(samples, q):.6f}")
+            lines.append(f"phonepe_span_seconds_count{labels(kind=kind, name=name, case=case)} {count}")
+            lines.append(f"phonepe_span_seconds_sum{labels(kind=kind, name=name, case=case)} {total:.6f}")
+        lines += ["# HELP phonepe_span_rows_total Rows returned by instrumented spans", "# TYPE phonepe_span_rows_total counter"]
+        lines += [f"phonepe_span_rows_total{labels(kind=k, name=n, case=c)} {r}" for (k, n, c), _, _, _, r, _ in items]
+        lines += ["# HELP phonepe_span_bytes_total In-memory bytes returned by instrumented spans", "# TYPE phonepe_span_bytes_total counter"]
+        lines += [f"phonepe_span_bytes_total{labels(kind=k, name=n, case=c)} {b}" for (k, n, c), _, _, _, _, b in items]
+        lines += ["# HELP phonepe_cache_requests_total Cache lookups by result", "# TYPE phonepe_cache_requests_total counter"]
+        for name, c in caches.items():
+            lines.append(f"phonepe_cache_requests_total{labels(cache=name, result='hit')} {c['hit']}")
+            lines.append(f"phonepe_cache_requests_total{labels(cache=name, result='miss')} {c['miss']}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+REGISTRY = Registry()
+
+def result_size(result) -> tuple:
+    frames = [r for r in (result if isinstance(result, tuple) else (result,)) if isinstance(r, pd.DataFrame)]
+    if not frames:
+        return None, None
+    return sum(len(df) for df in frames), int(sum(df.memory_usage(deep=True).sum() for df in frames))
+
+# Decorator for loaders, figure builders and draw helpers
+def timed(kind: str, name: str | None = None):
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            out = fn(*args, **kwargs)
+            rows, nbytes = result_size(out)
+            REGISTRY.record(kind, label, time.perf_counter() - start, rows, nbytes)
+            return out
+        return wrapper
+    return decorate
+
+# Wraps a Streamlit cache decorator so every lookup is counted as a hit or a miss. The miss flag lives on a
+# per-thread stack so nested cached calls (get_cube -> load_schema_catalog) are attributed separately.
+_lookups = threading.local()
+
+def instrumented_cache(name: str, cache):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _lookups.stack[-1] = False
+            return fn(*args, **kwargs)
+
+        cached = cache(compute)
+
+        @functools.wraps(fn)
+        def lookup(*args, **kwargs):
+            stack = _lookups.__dict__.setdefault("stack", [])
+            stack.append(True)
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                REGISTRY.record_cache(name, stack.pop())
+
+        lookup.clear = cached.clear
+        return lookup
+    return decorate
+
+_TABLE = re.compile(r"\bFROM\s+([`\"\[]?[\w.]+)", re.IGNORECASE)
+_QUOTES = "`\"["
+
+def statement_label(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "?"
+    m = _TABLE.search(statement)
+    return f"{verb} {m.group(1).strip(_QUOTES)}" if m else verb
+
+# Per-statement timing through SQLAlchemy cursor events; rows come from the DBAPI rowcount when the driver reports one
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("phonepe_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["phonepe_query_start"].pop()
+        rowcount = getattr(cursor, "rowcount", -1)
+        REGISTRY.record("sql", statement_label(statement), time.perf_counter() - start, rowcount if rowcount and rowcount > 0 else None)
+
+    @event.listens_for(engine, "handle_error")
+    def failed(exception_context):
+        starts = exception_context.connection.info.get("phonepe_query_start") if exception_context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    return engine
+
+# Runs `fn` in a copy of the caller's context (case label included); used for worker threads
+def in_context(fn):
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return run
@@ -0,0 +1,82 @@
+# The datasets each case study needs, declared once for the dashboard pages and the background warm-up
+from functools import partial
+
+from phonepe_growth import GROWTH_TABLES
+from phonepe_loaders import (load_insurance_engagement_statewise, load_insurance_engagement_yearly,
+                             load_insurance_statewise, load_insurance_yearly, load_payment_categories_overall,
+                             load_payment_categories_rollup, load_payment_categories_yearly, load_top_user_statewise,
+                             load_top_user_yearly, load_tran_statewise_from_map, load_tran_yearly_from_map,
+                             load_growth, load_user_brand, load_user_statewise, load_user_yearly)
+
+CASE_STUDIES = [
+    "Decoding Transaction Dynamics on PhonePe",
+    "Device Dominance and User Engagement Analysis",
+    "Insurance Penetration and Growth Potential",
+    "Transaction Analysis for Market Expansion",
+    "User Engagement and Growth Strategy",
+    "Insurance Engagement Analysis",
+]
+
+CATEGORY_ROLLUP = (load_payment_categories_rollup, ("years", "quarters", "states"))
+
+# Growth table of a table's first measure, the default view of its growth section
+def growth_plan(table: str) -> tuple:
+    return partial(load_growth, table, next(iter(GROWTH_TABLES[table][1]))), ("years", "quarters", "states")
+
+# case study -> dataset name -> (loader, filter names passed as its arguments)
+PAGE_PLANS = {
+    "Decoding Transaction Dynamics on PhonePe": {
+        "cat": CATEGORY_ROLLUP,
+        "trend": (load_payment_categories_yearly, ("quarters", "states")),
+        "cat_overall": (load_payment_categories_overall, ("years", "quarters")),
+        "growth": growth_plan("Aggre_transaction"),
+    },
+    "Device Dominance and User Engagement Analysis": {
+        "user_state": (load_user_statewise, ("years", "quarters", "states")),
+        "user_yearly": (load_user_yearly, ("quarters",)),
+        "brand": (load_user_brand, ("state", "years", "quarters")),
+        "cat": CATEGORY_ROLLUP,
+        "growth": growth_plan("Map_user"),
+        "brand_growth": growth_plan("Aggre_user"),
+    },
+    "Insurance Penetration and Growth Potential": {
+        "ins_state": (load_insurance_statewise, ("years", "quarters", "states")),
+        "ins_yearly": (load_insurance_yearly, ("quarters",)),
+        "cat": CATEGORY_ROLLUP,
+        "growth": growth_plan("Map_insurance"),
+    },
+    "Transaction Analysis for Market Expansion": {
+        "map_tran": (load_tran_statewise_from_map, ("years", "quarters", "states")),
+        "tran_yearly": (load_tran_yearly_from_map, ("quarters",)),
+        "cat": CATEGORY_ROLLUP,
+        "growth": growth_plan("Map_transaction"),
+    },
+    "User Engagement and Growth Strategy": {
+        "top_user": (load_top_user_statewise, ("years", "quarters", "states")),
+        "top_user_yearly": (load_top_user_yearly, ("quarters",)),
+        "cat": CATEGORY_ROLLUP,
+        "cat_overall": (load_payment_categories_overall, ("years", "quarters")),
+        "growth": growth_plan("Top_user"),
+    },
+    "Insurance Engagement Analysis": {
+        "ins_state": (load_insurance_engagement_statewise, ("years", "quarters", "states")),
+        "ins_yearly": (load_insurance_engagement_yearly, ("quarters",)),
+        "cat": CATEGORY_ROLLUP,
+        "growth": growth_plan("Top_insurance"),
+    },
+}
+
+# case study -> tables whose cubes (and growth panels) its datasets are sliced from, for the background warm-up
+PAGE_TABLES = {
+    "Decoding Transaction Dynamics on PhonePe": ["Aggre_transaction"],
+    "Device Dominance and User Engagement Analysis": ["Map_user", "Aggre_user", "Aggre_transaction"],
+    "Insurance Penetration and Growth Potential": ["Map_insurance", "Aggre_transaction"],
+    "Transaction Analysis for Market Expansion": ["Map_transaction", "Aggre_transaction"],
+    "User Engagement and Growth Strategy": ["Top_user", "Aggre_transaction"],
+    "Insurance Engagement Analysis": ["Top_insurance", "Aggre_transaction"],
+}
+
+# A fetch_all plan for one page; `state` is the single-state brand filter (None = all states)
+def page_plan(case: str, years: list, quarters: list, states: list, state: str | None = None) -> dict:
+    filters = {"years": years, "quarters": quarters, "states": states, "state": state}
+    return {name: (fn, tuple(filters[a] for a in arg_names)) for name, (fn, arg_names) in PAGE_PLANS[case].items()}
@@ -0,0 +1,224 @@
+# Result cache shared across server processes: aggregated query results keyed by a digest and tagged with the
+# data version, with a byte cap, LRU eviction and a TTL. Two backends:
+#
+#   PHONEPE_RESULT_CACHE=disk   Parquet files in PHONEPE_RESULT_CACHE_DIR (survives restarts, shared by replicas on one host)
+#   PHONEPE_RESULT_CACHE=redis  Arrow IPC blobs in Redis at PHONEPE_REDIS_URL (shared by every replica)
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RESULT_CACHE = os.environ.get("PHONEPE_RESULT_CACHE", "")
+RESULT_CACHE_DIR = os.environ.get("PHONEPE_RESULT_CACHE_DIR", "result_cache")
+RESULT_CACHE_MB = float(os.environ.get("PHONEPE_RESULT_CACHE_MB", "256"))
+RESULT_CACHE_TTL = float(os.environ.get("PHONEPE_RESULT_CACHE_TTL", "86400"))
+REDIS_URL = os.environ.get("PHONEPE_REDIS_URL", "redis://localhost:6379/0")
+
+def cache_key(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+def frame_to_arrow(df: pd.DataFrame) -> bytes:
+    sink = io.BytesIO()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def arrow_to_frame(data: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+# Parquet files named by key digest. The data version and creation time travel in the file's metadata; the
+# file's mtime is bumped on every hit, so the oldest mtimes are the least recently used entries.
+class DiskResultCache:
+    def __init__(self, directory: str = RESULT_CACHE_DIR, max_bytes: int = int(RESULT_CACHE_MB * 2**20), ttl: float = RESULT_CACHE_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.parquet")
+
+    def get(self, key: str, version: str) -> pd.DataFrame | None:
+        path = self._path(key)
+        try:
+            table = pq.read_table(path)
+        except (FileNotFoundError, OSError, pa.ArrowInvalid):
+            return None
+        meta = table.schema.metadata or {}
+        created = float(meta.get(b"phonepe_created", b"0"))
+        if meta.get(b"phonepe_version", b"").decode() != version or time.time() - created > self.ttl:
+            self.delete(key)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return table.to_pandas()
+
+    def put(self, key: str, version: str, df: pd.DataFrame):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        meta = dict(table.schema.metadata or {})
+        meta.update({b"phonepe_version": version.encode(), b"phonepe_created": str(time.time()).encode()})
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table.replace_schema_metadata(meta), tmp)
+        os.replace(tmp, path)
+        self.evict()
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.endswith(".parquet"):
+                    try:
+                        st = e.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".parquet"):
+                self.delete(name[:-len(".parquet")])
+
+# Key/value store with Redis semantics. Blobs expire through the store's own TTL; a sorted set of last-use
+# times and a hash of sizes keep the byte cap and the LRU order shared by every replica.
+class KeyValueResultCache:
+    def __init__(self, client, prefix: str = "phonepe:result", max_bytes: int = int(RESULT_CACHE_MB * 2**20), ttl: float = RESULT_CACHE_TTL):
+        self.client = client
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+    def _data(self, key: str) -> str:
+        return f"{self.prefix}:data:{key}"
+
+    def get(self, key: str, version: str) -> pd.DataFrame | None:
+        blob = self.client.get(self._data(key))
+        if blob is None:
+            self.client.zrem(f"{self.prefix}:lru", key)
+            self.client.hdel(f"{self.prefix}:size", key)
+            return None
+        stored_version, _, data = blob.partition(b"\n")
+        if stored_version.decode() != version:
+            self.delete(key)
+            return None
+        self.client.zadd(f"{self.prefix}:lru", {key: time.time()})
+        return arrow_to_frame(data)
+
+    def put(self, key: str, version: str, df: pd.DataFrame):
+        blob = version.encode() + b"\n" + frame_to_arrow(df)
+        self.client.set(self._data(key), blob, ex=max(1, int(self.ttl)))
+        self.client.zadd(f"{self.prefix}:lru", {key: time.time()})
+        self.client.hset(f"{self.prefix}:size", key, len(blob))
+        self.evict()
+
+    def delete(self, key: str):
+        self.client.delete(self._data(key))
+        self.client.zrem(f"{self.prefix}:lru", key)
+        self.client.hdel(f"{self.prefix}:size", key)
+
+    def evict(self):
+        sizes = {_text(k): int(v) for k, v in self.client.hgetall(f"{self.prefix}:size").items()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        for key in self.client.zrange(f"{self.prefix}:lru", 0, -1):
+            key = _text(key)
+            if total <= self.max_bytes:
+                break
+            total -= sizes.get(key, 0)
+            self.delete(key)
+
+    def clear(self):
+        for key in self.client.zrange(f"{self.prefix}:lru", 0, -1):
+            self.delete(_text(key))
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+# In-process stand-in for the Redis commands KeyValueResultCache uses (tests, benchmarks, single-host demos)
+class MemoryKV:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.zsets = {}
+        self.hashes = {}
+
+    def get(self, name):
+        with self.lock:
+            value, expires = self.values.get(name, (None, None))
+            if expires is not None and expires < time.time():
+                del self.values[name]
+                return None
+            return value
+
+    def set(self, name, value, ex=None):
+        with self.lock:
+            self.values[name] = (value, time.time() + ex if ex else None)
+
+    def delete(self, *names):
+        with self.lock:
+            for name in names:
+                self.values.pop(name, None)
+
+    def zadd(self, name, mapping: dict):
+        with self.lock:
+            self.zsets.setdefault(name, {}).update(mapping)
+
+    def zrem(self, name, *members):
+        with self.lock:
+            for m in members:
+                self.zsets.get(name, {}).pop(m, None)
+
+    def zrange(self, name, start, end):
+        with self.lock:
+            members = sorted(self.zsets.get(name, {}).items(), key=lambda kv: kv[1])
+        members = [m for m, _ in members]
+        return members[start:] if end == -1 else members[start:end + 1]
+
+    def hset(self, name, key, value):
+        with self.lock:
+            self.hashes.setdefault(name, {})[key] = value
+
+    def hdel(self, name, *keys):
+        with self.lock:
+            for k in keys:
+                self.hashes.get(name, {}).pop(k, None)
+
+    def hgetall(self, name) -> dict:
+        with self.lock:
+            return dict(self.hashes.get(name, {}))
+
+def create_result_cache(kind: str = RESULT_CACHE):
+    if kind == "disk":
+        return DiskResultCache()
+    if kind == "redis":
+        import redis
+
+        return KeyValueResultCache(redis.Redis.from_url(REDIS_URL))
+    if kind == "memory":
+        return KeyValueResultCache(MemoryKV())
+    return None
@@ -0,0 +1,237 @@
+# Explicit DDL and idempotent migrations for the PhonePe tables (TiDB/MySQL, SQLite or DuckDB stand-ins)
+#
+#   python phonepe_schema.py [--url sqlite:///phonepe.db] [--status]
+import argparse
+import time
+
+from sqlalchemy import (BigInteger, Column, Double, Index, Integer, MetaData, SmallInteger, String, Table,
+                        inspect, text)
+from sqlalchemy.dialects import mysql
+
+from phonepe_db import REMOTE_URL, create_remote_engine
+from phonepe_states import INDIA_STATES, STATE_DIM, state_id
+
+TinyInteger = SmallInteger().with_variant(mysql.TINYINT(), "mysql")
+
+TOP_METRIC_COLUMNS = {
+    "district_entityName": "string", "district_count": "Int64", "district_amount": "float64",
+    "pincode_entityName": "string", "pincode_count": "Int64", "pincode_amount": "float64",
+}
+
+# table -> (quarter column, pandas dtypes of the columns after State/Year/quarter)
+TABLE_SCHEMAS = {
+    "Aggre_transaction": ("Quater", {"Transaction_type": "category", "Transaction_count": "int64", "Transaction_amount": "float64"}),
+    "Aggre_user": ("Quater", {"Brand": "category", "Count": "int64", "Percentage": "float64"}),
+    "Aggre_insurance": ("Quarter", {"Name": "category", "Insurance_Count": "int64", "Insurance_Amount": "float64"}),
+    "Map_transaction": ("Quarter", {"Transaction_district_name": "string", "Transaction_count": "int64", "Transaction_amount": "float64"}),
+    "Map_user": ("Quarter", {"users_district_name": "string", "registeredUsers": "int64", "number_appOpens": "int64"}),
+    "Map_insurance": ("Quarter", {"insurance_district_name": "string", "insurance_count": "int64", "insurance_amount": "float64"}),
+    "Top_transaction": ("Quarter", TOP_METRIC_COLUMNS),
+    "Top_user": ("Quarter", {"district_name": "string", "district_registeredUsers": "Int64",
+                             "pincode_name": "string", "pincode_registeredUsers": "Int64"}),
+    "Top_insurance": ("Quarter", TOP_METRIC_COLUMNS),
+}
+
+SQL_TYPES = {
+    "category": lambda: String(128),
+    "string": lambda: String(128),
+    "int64": BigInteger,
+    "Int64": BigInteger,
+    "float64": Double,
+}
+
+def table_dtypes(table: str) -> dict:
+    quarter_col, columns = TABLE_SCHEMAS[table]
+    return {"state_id": "Int8", "Year": "int16", quarter_col: "int8", **columns}
+
+metadata = MetaData()
+
+state_dim = Table(
+    "dim_state", metadata,
+    Column("state_id", TinyInteger, primary_key=True, autoincrement=False),
+    Column("State", String(64), nullable=False, unique=True),
+)
+
+schema_migrations = Table(
+    "schema_migrations", metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(128), nullable=False),
+    Column("applied_at", String(32), nullable=False),
+)
+
+def _fact_table(name: str) -> Table:
+    quarter_col, columns = TABLE_SCHEMAS[name]
+    return Table(
+        name, metadata,
+        Column("State", String(64), nullable=False),
+        Column("state_id", TinyInteger),
+        Column("Year", SmallInteger, nullable=False),
+        Column(quarter_col, TinyInteger, nullable=False),
+        *[Column(col, SQL_TYPES[dtype]()) for col, dtype in columns.items()],
+        Index(f"ix_{name}_year_quarter_state", "Year", quarter_col, "State"),
+        Index(f"ix_{name}_state_key", "state_id", "Year", quarter_col),
+    )
+
+FACT_TABLES = {name: _fact_table(name) for name in TABLE_SCHEMAS}
+
+def create_fact_table(engine, name: str) -> Table:
+    FACT_TABLES[name].create(engine, checkfirst=True)
+    return FACT_TABLES[name]
+
+# Ingest-time summaries at State × Year × Quarter grain: source table -> (extra dimensions, summed measures).
+# Each summary keeps the source's column names plus row_count, the number of source rows behind each group.
+SUMMARY_SPECS = {
+    "Aggre_transaction": (["Transaction_type"], ["Transaction_count", "Transaction_amount"]),
+    "Aggre_user": (["Brand"], ["Count"]),
+    "Map_transaction": ([], ["Transaction_count", "Transaction_amount"]),
+    "Map_user": ([], ["registeredUsers", "number_appOpens"]),
+    "Map_insurance": ([], ["insurance_count", "insurance_amount"]),
+    "Top_user": ([], ["district_registeredUsers"]),
+    "Top_insurance": ([], ["district_count", "district_amount"]),
+}
+
+def summary_name(table: str) -> str:
+    return f"{table}_summary"
+
+def _summary_table(source: str) -> Table:
+    quarter_col, columns = TABLE_SCHEMAS[source]
+    dims, measures = SUMMARY_SPECS[source]
+    name = summary_name(source)
+    return Table(
+        name, metadata,
+        Column("State", String(64), nullable=False),
+        Column("state_id", TinyInteger),
+        Column("Year", SmallInteger, nullable=False),
+        Column(quarter_col, TinyInteger, nullable=False),
+        *[Column(col, SQL_TYPES[columns[col]]()) for col in dims + measures],
+        Column("row_count", BigInteger, nullable=False),
+        Index(f"ix_{name}_year_quarter_state", "Year", quarter_col, "State"),
+    )
+
+SUMMARY_TABLES = {source: _summary_table(source) for source in SUMMARY_SPECS}
+
+def _create_state_dim(engine):
+    state_dim.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        existing = {r[0] for r in conn.execute(state_dim.select().with_only_columns(state_dim.c.state_id))}
+        rows = [{"state_id": int(r.state_id), "State": r.State} for r in STATE_DIM.itertuples() if r.state_id not in existing]
+        if rows:
+            conn.execute(state_dim.insert(), rows)
+
+# Tables created by DataFrame.to_sql carry TEXT/BIGINT columns; on MySQL/TiDB they are retyped in place.
+# Other dialects cannot MODIFY columns, so only missing tables are created there.
+def _create_or_retype_fact_tables(engine):
+    insp = inspect(engine)
+    for name, table in FACT_TABLES.items():
+        if not insp.has_table(name):
+            table.create(engine)
+            continue
+        if engine.dialect.name != "mysql":
+            continue
+        current = {c["name"]: c for c in insp.get_columns(name)}
+        with engine.begin() as conn:
+            for col in table.columns:
+                if col.name not in current or col.name == "state_id":
+                    continue
+                target = col.type.compile(dialect=engine.dialect)
+                if str(current[col.name]["type"]).split("(")[0].upper() != target.split("(")[0].upper():
+                    null = "NOT NULL" if not col.nullable else "NULL"
+                    conn.execute(text(f"ALTER TABLE `{name}` MODIFY COLUMN `{col.name}` {target} {null}"))
+
+# Keys are computed in Python over each table's distinct State spellings, so legacy aliases ("Andaman And Nicobar")
+# get the same key as the canonical name; those rows are renamed to the canonical name at the same time.
+# Returns whether any row changed. Names outside INDIA_STATES keep their spelling and a NULL key.
+def _canonicalise_states(conn, name: str) -> bool:
+    update = text(
+        f"UPDATE {name} SET State = :state, state_id = :state_id "
+        "WHERE State = :raw AND (state_id IS NULL OR state_id <> :state_id OR State <> :state)"
+    )
+    changed = 0
+    for (raw,) in conn.execute(text(f"SELECT DISTINCT State FROM {name} WHERE State IS NOT NULL")).fetchall():
+        sid = state_id(raw)
+        if sid >= 0:
+            changed += conn.execute(update, {"raw": raw, "state": INDIA_STATES[sid], "state_id": sid}).rowcount
+    return changed > 0
+
+def _add_state_keys(engine):
+    insp = inspect(engine)
+    for name in FACT_TABLES:
+        if "state_id" not in {c["name"] for c in insp.get_columns(name)}:
+            target = TinyInteger.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {name} ADD COLUMN state_id {target}"))
+        with engine.begin() as conn:
+            _canonicalise_states(conn, name)
+
+# Databases that ran the earlier, exact-name backfill: legacy spellings are canonicalised and keyed, and the
+# summaries of the tables that changed are rebuilt from the renamed rows
+def _canonicalise_legacy_states(engine):
+    from phonepe_summary import refresh_summary
+
+    for name in FACT_TABLES:
+        with engine.begin() as conn:
+            if _canonicalise_states(conn, name) and name in SUMMARY_SPECS and inspect(conn).has_table(summary_name(name)):
+                refresh_summary(conn, name)
+
+def _create_indexes(engine):
+    insp = inspect(engine)
+    for name, table in FACT_TABLES.items():
+        existing = {ix["name"] for ix in insp.get_indexes(name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+
+# Summaries of tables loaded before this migration are built from their current rows
+def _create_summary_tables(engine):
+    from phonepe_summary import rebuild_summaries
+
+    insp = inspect(engine)
+    for table in SUMMARY_TABLES.values():
+        table.create(engine, checkfirst=True)
+    rebuild_summaries(engine, [t for t in SUMMARY_SPECS if insp.has_table(t)])
+
+MIGRATIONS = [
+    (1, "state dimension", _create_state_dim),
+    (2, "typed fact tables", _create_or_retype_fact_tables),
+    (3, "dictionary-encoded state keys", _add_state_keys),
+    (4, "composite (Year, Quarter, State) indexes", _create_indexes),
+    (5, "State × Year × Quarter summary tables", _create_summary_tables),
+    (6, "canonical state names and keys for legacy spellings", _canonicalise_legacy_states),
+]
+
+def applied_versions(engine) -> set:
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return {r[0] for r in conn.execute(schema_migrations.select().with_only_columns(schema_migrations.c.version))}
+
+# Every step is itself safe to repeat; the migrations table just lets later runs skip finished ones
+def migrate(engine) -> list:
+    done = applied_versions(engine)
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        step(engine)
+        with engine.begin() as conn:
+            conn.execute(schema_migrations.insert(), {"version": version, "name": name, "applied_at": time.strftime("%Y-%m-%d %H:%M:%S")})
+        applied.append(version)
+    return applied
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the PhonePe schema migrations")
+    parser.add_argument("--url", default=REMOTE_URL)
+    parser.add_argument("--status", action="store_true", help="list which migrations have been applied")
+    args = parser.parse_args()
+    engine = create_remote_engine(args.url)
+    try:
+        if args.status:
+            done = applied_versions(engine)
+            for version, name, _ in MIGRATIONS:
+                print(f"{'x' if version in done else ' '} {version} {name}")
+        else:
+            print(f"applied: {migrate(engine) or 'nothing to do'}")
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Pull every dashboard table from TiDB into local Parquet files for PHONEPE_BACKEND=snapshot
+#
+#   python phonepe_snapshot.py [--dir snapshot] [--tables Map_user Top_user ...]
+import argparse
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import inspect, text
+
+from phonepe_db import DASHBOARD_TABLES, SNAPSHOT_DIR, create_remote_engine, snapshot_manifest
+from phonepe_schema import SUMMARY_SPECS, summary_name
+
+CHUNK_ROWS = 100_000
+
+logger = logging.getLogger("phonepe.snapshot")
+
+# Streams one table through a server-side cursor and swaps the finished file in atomically
+def sync_table(engine, table: str, snapshot_dir: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    target = os.path.join(snapshot_dir, f"{table}.parquet")
+    tmp = target + ".tmp"
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        with engine.connect().execution_options(stream_results=True) as conn:
+            for chunk in pd.read_sql_query(text(f"SELECT * FROM {table}"), conn, chunksize=chunk_rows):
+                if writer is None:
+                    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(tmp, schema)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows += len(chunk)
+        if writer is None:
+            with engine.connect() as conn:
+                empty = pd.read_sql_query(text(f"SELECT * FROM {table} LIMIT 0"), conn)
+            pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), tmp)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, target)
+    return rows
+
+# The dashboard tables plus whichever summary tables the database has
+def snapshot_tables(engine) -> list:
+    insp = inspect(engine)
+    return DASHBOARD_TABLES + [summary_name(t) for t in SUMMARY_SPECS if insp.has_table(summary_name(t))]
+
+# Per-table rows and seconds go into the returned manifest and one JSON line each on the "phonepe.snapshot" logger
+def sync_snapshot(engine, snapshot_dir: str = SNAPSHOT_DIR, tables: list | None = None) -> dict:
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest = snapshot_manifest(snapshot_dir) or {"tables": {}}
+    for table in tables or snapshot_tables(engine):
+        start = time.perf_counter()
+        rows = sync_table(engine, table, snapshot_dir)
+        manifest["tables"][table] = {"rows": rows, "seconds": round(time.perf_counter() - start, 3)}
+        logger.info(json.dumps({"table": table, **manifest["tables"][table]}))
+    manifest["synced_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    tmp = os.path.join(snapshot_dir, "manifest.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(snapshot_dir, "manifest.json"))
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync PhonePe dashboard tables into a local Parquet snapshot")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--tables", nargs="*", default=None, help="tables to sync (default: all dashboard and summary tables)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    engine = create_remote_engine()
+    try:
+        sync_snapshot(engine, args.dir, args.tables)
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Canonical state dimension shared by ingestion and the dashboard.
+# Every raw spelling (Pulse directory slug, title case, legacy aliases) maps to a small integer id.
+import numpy as np
+import pandas as pd
+
+INDIA_STATES = [
+    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh",
+    "Goa", "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand",
+    "Karnataka", "Kerala", "Madhya Pradesh", "Maharashtra", "Manipur",
+    "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Punjab",
+    "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Tripura",
+    "Uttar Pradesh", "Uttarakhand", "West Bengal",
+    "Andaman & Nicobar Islands", "Chandigarh", "Dadra & Nagar Haveli & Daman & Diu",
+    "Delhi", "Jammu & Kashmir", "Ladakh", "Lakshadweep", "Puducherry"
+]
+
+# Spellings that differ from the canonical name by more than case, hyphens or "and"/"&"
+STATE_FIXES = {
+    "Nct Of Delhi": "Delhi",
+    "Odissa": "Odisha",
+    "Orissa": "Odisha",
+    "Pondicherry": "Puducherry",
+    "Andaman And Nicobar": "Andaman & Nicobar Islands",
+    "Dadra And Nagar Haveli And Daman Diu": "Dadra & Nagar Haveli & Daman & Diu",
+    "Uttaranchal": "Uttarakhand",
+}
+
+# The canonical names double as the GeoJSON ST_NM keys
+STATE_DIM = pd.DataFrame({
+    "state_id": np.arange(len(INDIA_STATES), dtype=np.int8),
+    "State": INDIA_STATES,
+    "State_geo": INDIA_STATES,
+})
+STATE_DTYPE = pd.CategoricalDtype(INDIA_STATES)
+
+def state_key(name: str) -> str:
+    s = " ".join(name.replace("-", " ").split()).casefold()
+    return " ".join("&" if w == "and" else w for w in s.split())
+
+STATE_INDEX = {state_key(name): i for i, name in enumerate(INDIA_STATES)}
+STATE_INDEX.update({state_key(raw): STATE_INDEX[state_key(name)] for raw, name in STATE_FIXES.items()})
+
+def state_id(name) -> int:
+    return STATE_INDEX.get(state_key(name), -1) if isinstance(name, str) else -1
+
+# Only the distinct spellings are looked up; unknown names are kept as extra categories after the canonical ones
+def canonical_states(values) -> pd.Categorical:
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    extra = {}
+    ids = np.empty(len(uniques), dtype=np.int64)
+    for i, raw in enumerate(uniques):
+        sid = state_id(raw)
+        if sid < 0:
+            sid = extra.setdefault(str(raw).strip(), len(INDIA_STATES) + len(extra))
+        ids[i] = sid
+    mapped = np.full(len(codes), -1, dtype=np.int64)
+    valid = codes >= 0
+    mapped[valid] = ids[codes[valid]]
+    return pd.Categorical.from_codes(mapped, categories=INDIA_STATES + list(extra))
+
+# Dictionary-encoded key stored next to State in the fact tables; names outside INDIA_STATES get no key
+def state_ids(states) -> pd.Series:
+    codes = pd.Series(canonical_states(states).codes, dtype="int64")
+    return codes.where((codes >= 0) & (codes < len(INDIA_STATES))).astype("Int8")
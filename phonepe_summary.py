@@ -0,0 +1,90 @@
+# Maintenance of the State × Year × Quarter summary tables declared in phonepe_schema.SUMMARY_SPECS. Every refresh
+# is a DELETE + INSERT ... SELECT ... GROUP BY inside the caller's transaction, so readers see either the old or the
+# new summary and the summary always commits together with the rows it was built from.
+#
+#   python phonepe_summary.py [--url sqlite:///phonepe.db] [--tables Map_user Top_user ...] [--status]
+import argparse
+import time
+
+from sqlalchemy import bindparam, inspect, text
+
+from phonepe_db import REMOTE_URL, create_remote_engine
+from phonepe_schema import SUMMARY_SPECS, SUMMARY_TABLES, TABLE_SCHEMAS, summary_name
+
+def _columns(source: str) -> tuple:
+    quarter_col = TABLE_SCHEMAS[source][0]
+    dims, measures = SUMMARY_SPECS[source]
+    return ["State", "state_id", "Year", quarter_col] + dims, measures
+
+def _partition_filter(source: str) -> str:
+    quarter_col = TABLE_SCHEMAS[source][0]
+    return f"State = :state AND Year = :year AND {quarter_col} = :quarter"
+
+def _insert_select(source: str, where: str = "") -> str:
+    keys, measures = _columns(source)
+    group = ", ".join(keys)
+    sums = ", ".join(f"SUM({m})" for m in measures)
+    target = ", ".join(keys + measures + ["row_count"])
+    return (f"INSERT INTO {summary_name(source)} ({target}) SELECT {group}, {sums}, COUNT(*) FROM {source}"
+            f"{' WHERE ' + where if where else ''} GROUP BY {group}")
+
+# Rebuilds the whole summary, or only the given (State, Year, Quarter) partitions
+def refresh_summary(conn, source: str, partitions: list | None = None):
+    summary = summary_name(source)
+    if partitions is None:
+        conn.execute(text(f"DELETE FROM {summary}"))
+        conn.execute(text(_insert_select(source)))
+        return
+    if not partitions:
+        return
+    params = [{"state": s, "year": y, "quarter": q} for s, y, q in partitions]
+    where = _partition_filter(source)
+    names = (bindparam("state"), bindparam("year"), bindparam("quarter"))
+    conn.execute(text(f"DELETE FROM {summary} WHERE {where}").bindparams(*names), params)
+    conn.execute(text(_insert_select(source, where)).bindparams(*names), params)
+
+def rebuild_summaries(engine, tables: list | None = None) -> dict:
+    seconds = {}
+    for source in tables or list(SUMMARY_SPECS):
+        start = time.perf_counter()
+        SUMMARY_TABLES[source].create(engine, checkfirst=True)
+        with engine.begin() as conn:
+            refresh_summary(conn, source)
+        seconds[source] = round(time.perf_counter() - start, 3)
+    return seconds
+
+# Source rows vs summary groups (and summary rows accounted for), per table
+def summary_status(engine) -> list:
+    insp = inspect(engine)
+    rows = []
+    with engine.connect() as conn:
+        for source in SUMMARY_SPECS:
+            if not insp.has_table(source):
+                continue
+            summary = summary_name(source)
+            source_rows = conn.execute(text(f"SELECT COUNT(*) FROM {source}")).scalar()
+            groups, covered = (conn.execute(text(f"SELECT COUNT(*), SUM(row_count) FROM {summary}")).one()
+                               if insp.has_table(summary) else (None, None))
+            rows.append({"table": source, "rows": source_rows, "summary_rows": groups, "covered": int(covered or 0)})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the State × Year × Quarter summary tables")
+    parser.add_argument("--url", default=REMOTE_URL)
+    parser.add_argument("--tables", nargs="*", default=None, help="source tables to summarise (default: all)")
+    parser.add_argument("--status", action="store_true", help="compare summary coverage with the source tables")
+    args = parser.parse_args()
+    engine = create_remote_engine(args.url)
+    try:
+        if args.status:
+            for r in summary_status(engine):
+                stale = "" if r["covered"] == r["rows"] else "  (stale)"
+                print(f"{r['table']}: {r['rows']} rows -> {r['summary_rows']} summary rows{stale}")
+        else:
+            for source, secs in rebuild_summaries(engine, args.tables).items():
+                print(f"{summary_name(source)} rebuilt in {secs}s")
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# Synthetic PhonePe Pulse data at configurable scale: a Pulse-shaped JSON tree, the ingested tables and a
+# local database stand-in (SQLite file, plus a Parquet snapshot for the DuckDB backend)
+#
+#   python phonepe_synth.py --scale small --out bench_data
+#   python phonepe_synth.py --scale medium --districts 40 --seed 7 --out bench_data
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from phonepe_states import INDIA_STATES
+
+# states × years × quarters × districts × categories (× device brands)
+SCALES = {
+    "tiny": {"states": 4, "years": 2, "quarters": 4, "districts": 3, "categories": 3, "brands": 4},
+    "small": {"states": 12, "years": 4, "quarters": 4, "districts": 8, "categories": 5, "brands": 8},
+    "medium": {"states": 36, "years": 6, "quarters": 4, "districts": 25, "categories": 5, "brands": 12},
+    "large": {"states": 36, "years": 8, "quarters": 4, "districts": 80, "categories": 8, "brands": 20},
+}
+FIRST_YEAR = 2018
+
+CATEGORIES = ["Recharge & bill payments", "Peer-to-peer payments", "Merchant payments", "Financial Services", "Others"]
+BRANDS = ["Xiaomi", "Samsung", "Vivo", "Oppo", "Realme", "Apple", "Motorola", "OnePlus", "Huawei", "Lenovo",
+          "Tecno", "Infinix", "Gionee", "Asus", "Micromax", "Lava", "HMD Global", "Coolpad", "Lyf", "Others"]
+
+def _names(base: list, n: int, prefix: str) -> list:
+    return (base + [f"{prefix} {i}" for i in range(len(base) + 1, n + 1)])[:n]
+
+# Pulse directory names are lower-case slugs ("andaman-&-nicobar-islands")
+def state_slug(name: str) -> str:
+    return name.lower().replace(" ", "-")
+
+def resolve_scale(scale: str = "small", **overrides) -> dict:
+    out = dict(SCALES[scale])
+    out.update({k: v for k, v in overrides.items() if v is not None})
+    out["states"] = min(out["states"], len(INDIA_STATES))
+    out["quarters"] = min(out["quarters"], 4)
+    return out
+
+def _write(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"success": True, "code": "SUCCESS", "data": data}, f, separators=(",", ":"))
+
+def _metric(count: float, amount: float) -> dict:
+    return {"type": "TOTAL", "count": int(count), "amount": float(amount)}
+
+# Every state gets a size and a quarterly growth rate, so maps, rankings and trends are not flat noise
+def generate_tree(data_root: str, scale: dict, seed: int = 0) -> int:
+    rng = np.random.default_rng(seed)
+    states = INDIA_STATES[:scale["states"]]
+    categories = _names(CATEGORIES, scale["categories"], "Category")
+    brands = _names(BRANDS, scale["brands"], "Brand")
+    size = rng.lognormal(0, 1.2, len(states))
+    growth = rng.uniform(1.01, 1.12, len(states))
+    cat_mix = rng.dirichlet(np.ones(len(categories)) * 2)
+    brand_mix = rng.dirichlet(np.ones(len(brands)))
+    files = 0
+    for s, state in enumerate(states):
+        slug = state_slug(state)
+        districts = [f"{state} district {d + 1}".lower() for d in range(scale["districts"])]
+        district_mix = rng.dirichlet(np.ones(len(districts)))
+        for y in range(scale["years"]):
+            year = FIRST_YEAR + y
+            for q in range(1, scale["quarters"] + 1):
+                t = y * 4 + q
+                scale_t = size[s] * growth[s] ** t
+                txn = rng.poisson(1e6 * scale_t * cat_mix) + 1
+                users = rng.poisson(2e5 * scale_t * brand_mix) + 1
+                d_users = rng.poisson(2e5 * scale_t * district_mix) + 1
+                d_txn = rng.poisson(1e6 * scale_t * district_mix) + 1
+                d_ins = rng.poisson(1e3 * scale_t * district_mix) + 1
+                ticket = rng.uniform(800, 2500)
+                premium = rng.uniform(300, 900)
+                path = lambda dataset: os.path.join(data_root, dataset, "country", "india", "state", slug, str(year), f"{q}.json")
+                _write(path("aggregated/transaction"), {"transactionData": [
+                    {"name": c, "paymentInstruments": [_metric(n, n * ticket * rng.uniform(0.5, 1.5))]}
+                    for c, n in zip(categories, txn)
+                ]})
+                _write(path("aggregated/user"), {"usersByDevice": [
+                    {"brand": b, "count": int(n), "percentage": float(n / users.sum())} for b, n in zip(brands, users)
+                ]})
+                _write(path("aggregated/insurance"), {"transactionData": [
+                    {"name": "Insurance", "paymentInstruments": [_metric(d_ins.sum(), d_ins.sum() * premium)]}
+                ]})
+                _write(path("map/transaction/hover"), {"hoverDataList": [
+                    {"name": d, "metric": [_metric(n, n * ticket)]} for d, n in zip(districts, d_txn)
+                ]})
+                _write(path("map/user/hover"), {"hoverData": {
+                    d: {"registeredUsers": int(n), "appOpens": int(n * rng.uniform(5, 40))} for d, n in zip(districts, d_users)
+                }})
+                _write(path("map/insurance/hover"), {"hoverDataList": [
+                    {"name": d, "metric": [_metric(n, n * premium)]} for d, n in zip(districts, d_ins)
+                ]})
+                top = np.argsort(-d_txn)[:10]
+                pincodes = [str(400000 + s * 1000 + i) for i in range(len(top))]
+                _write(path("top/transaction"), {
+                    "districts": [{"entityName": districts[i], "metric": _metric(d_txn[i], d_txn[i] * ticket)} for i in top],
+                    "pincodes": [{"entityName": p, "metric": _metric(d_txn[i] // 3, d_txn[i] // 3 * ticket)} for p, i in zip(pincodes, top)],
+                })
+                _write(path("top/user"), {
+                    "districts": [{"name": districts[i], "registeredUsers": int(d_users[i])} for i in top],
+                    "pincodes": [{"name": p, "registeredUsers": int(d_users[i] // 3)} for p, i in zip(pincodes, top)],
+                })
+                _write(path("top/insurance"), {
+                    "districts": [{"entityName": districts[i], "metric": _metric(d_ins[i], d_ins[i] * premium)} for i in top],
+                    "pincodes": [{"entityName": p, "metric": _metric(d_ins[i] // 3, d_ins[i] // 3 * premium)} for p, i in zip(pincodes, top)],
+                })
+                files += 9
+    return files
+
+# Typed DDL and migrations first, then the ingested frames through the same bulk loader TiDB gets.
+# Database modules are imported on use: phonepe_db reads PHONEPE_* settings at import time and
+# phonepe_bench.py points them at the stand-in first.
+def build_standin(url: str, frames: dict) -> list:
+    from phonepe_bulkload import bulk_engine, load_tables
+    from phonepe_schema import migrate
+
+    engine = bulk_engine(url, workers=1)
+    try:
+        migrate(engine)
+        return load_tables(engine, frames, workers=1, mode="replace")
+    finally:
+        engine.dispose()
+
+def build_snapshot(url: str, snapshot_dir: str) -> dict:
+    from phonepe_db import create_remote_engine
+    from phonepe_snapshot import sync_snapshot
+
+    engine = create_remote_engine(url)
+    try:
+        return sync_snapshot(engine, snapshot_dir)
+    finally:
+        engine.dispose()
+
+def dataset_paths(out_dir: str) -> dict:
+    out_dir = os.path.abspath(out_dir)
+    return {
+        "pulse": os.path.join(out_dir, "pulse", "data"),
+        "tables": os.path.join(out_dir, "tables"),
+        "db": os.path.join(out_dir, "standin.db"),
+        "url": "sqlite:///" + os.path.join(out_dir, "standin.db").replace("\\", "/"),
+        "snapshot": os.path.join(out_dir, "snapshot"),
+        "meta": os.path.join(out_dir, "synth.json"),
+    }
+
+# Regenerates only when the scale or seed differ from what is already on disk, so repeated benchmark runs
+# measure the same bytes
+def prepare(out_dir: str, scale: dict, seed: int = 0, workers: int | None = None, force: bool = False) -> dict:
+    from phonepe_ingest import ingest
+
+    paths = dataset_paths(out_dir)
+    wanted = {"scale": scale, "seed": seed}
+    if not force and os.path.exists(paths["meta"]):
+        with open(paths["meta"], "r") as f:
+            meta = json.load(f)
+        if {k: meta.get(k) for k in wanted} == wanted:
+            return paths
+    for key in ("pulse", "tables", "snapshot"):
+        shutil.rmtree(paths[key], ignore_errors=True)
+    if os.path.exists(paths["db"]):
+        os.remove(paths["db"])
+    start = time.perf_counter()
+    files = generate_tree(paths["pulse"], scale, seed)
+    frames = ingest(paths["pulse"], workers=workers)
+    os.makedirs(paths["tables"], exist_ok=True)
+    for table, df in frames.items():
+        df.to_parquet(os.path.join(paths["tables"], f"{table}.parquet"), index=False)
+    build_standin(paths["url"], frames)
+    build_snapshot(paths["url"], paths["snapshot"])
+    meta = dict(wanted, files=files, rows={t: len(df) for t, df in frames.items()},
+                seconds=round(time.perf_counter() - start, 3), created_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+    with open(paths["meta"], "w") as f:
+        json.dump(meta, f, indent=2)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic PhonePe Pulse data and a local database stand-in")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for dim in SCALES["small"]:
+        parser.add_argument(f"--{dim}", type=int, default=None, help=f"override the scale's {dim}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_data")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="regenerate even if the same scale is on disk")
+    args = parser.parse_args()
+    scale = resolve_scale(args.scale, **{dim: getattr(args, dim) for dim in SCALES["small"]})
+    paths = prepare(args.out, scale, args.seed, args.workers, args.force)
+    with open(paths["meta"], "r") as f:
+        meta = json.load(f)
+    print(f"{meta['files']} JSON files, {sum(meta['rows'].values())} rows; SQLite stand-in at {paths['url']}, snapshot in {paths['snapshot']}")
+
+if __name__ == "__main__":
+    main()
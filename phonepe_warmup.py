@@ -0,0 +1,117 @@
+# Background cache warm-up: every table cube and growth panel is built at start-up and rebuilt shortly before the
+# cube TTL runs out, and the cubes and panels of the page a visitor is likely to open next are re-checked speculatively.
+# Page datasets are cheap, uncached slices of these, so they are left to the page itself.
+# All work shares one small thread pool so it never holds more than WARMUP_WORKERS database connections.
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from phonepe_cube import CUBE_SPECS
+from phonepe_growth import GROWTH_TABLES
+from phonepe_loaders import CUBE_TTL, data_version, get_cube, get_growth_panel, load_years_quarters
+from phonepe_metrics import CASE, REGISTRY
+from phonepe_pages import CASE_STUDIES, PAGE_TABLES
+
+WARMUP_ENABLED = os.environ.get("PHONEPE_WARMUP", "1") == "1"
+# With FETCH_WORKERS (4) this stays within the default pool size of 5
+WARMUP_WORKERS = int(os.environ.get("PHONEPE_WARMUP_WORKERS", "1"))
+# Seconds before expiry at which cubes are rebuilt
+WARMUP_LEAD = float(os.environ.get("PHONEPE_WARMUP_LEAD", "60"))
+# Speculative prefetches are dropped while this many jobs are already queued
+MAX_PENDING = 4
+
+logger = logging.getLogger("phonepe.warmup")
+
+class WarmupScheduler:
+    def __init__(self, enabled: bool = WARMUP_ENABLED, workers: int = WARMUP_WORKERS, lead: float = WARMUP_LEAD, ttl: float = CUBE_TTL):
+        self.enabled = enabled
+        self.interval = max(ttl - lead, 1.0)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="warmup")
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.transitions = {}
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if not self.enabled:
+            return self
+        self.thread = threading.Thread(target=self._loop, name="warmup-scheduler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self):
+        while not self.stopped.is_set():
+            future = self.submit("cycle", self.cycle)
+            if future is not None:
+                future.result()
+            self.stopped.wait(self.interval)
+
+    # Jobs with the same key are not queued twice; `optional` jobs are skipped when the pool is backed up
+    def submit(self, key, fn, *args, optional: bool = False):
+        with self.lock:
+            if key in self.pending or (optional and len(self.pending) >= MAX_PENDING):
+                return None
+            self.pending.add(key)
+
+        def run():
+            CASE.set("warmup")
+            start = time.perf_counter()
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("warm-up job %s failed", key)
+            finally:
+                REGISTRY.record("warmup", key[0] if isinstance(key, tuple) else key, time.perf_counter() - start)
+                with self.lock:
+                    self.pending.discard(key)
+
+        return self.pool.submit(run)
+
+    # Cubes are cleared one key at a time and rebuilt at once, so a visitor never finds all of them expired
+    def cycle(self):
+        load_years_quarters.clear()
+        load_years_quarters()
+        for table in CUBE_SPECS:
+            get_cube.clear(table)
+            get_cube(table)
+        self.warm_tables(list(GROWTH_TABLES), rebuild=True)
+
+    # Growth panels are keyed by data version, so a rebuild clears the panel first
+    def warm_tables(self, tables: list, rebuild: bool = False):
+        version = data_version()
+        for table in tables:
+            get_cube(table)
+            for measure in GROWTH_TABLES.get(table, (None, {}))[1]:
+                if rebuild:
+                    get_growth_panel.clear(table, measure, version)
+                get_growth_panel(table, measure, version)
+
+    def note_visit(self, previous: str | None, case: str):
+        if previous and previous != case:
+            with self.lock:
+                self.transitions.setdefault(previous, Counter())[case] += 1
+
+    # The most frequent next page seen from `case`, else the next one in the sidebar
+    def likely_next(self, case: str) -> str:
+        with self.lock:
+            seen = self.transitions.get(case)
+            if seen:
+                return seen.most_common(1)[0][0]
+        return CASE_STUDIES[(CASE_STUDIES.index(case) + 1) % len(CASE_STUDIES)]
+
+    def prefetch(self, case: str):
+        if not self.enabled:
+            return None
+        return self.submit(("prefetch", case), self.warm_tables, PAGE_TABLES[case], optional=True)
+
+# A disabled scheduler (PHONEPE_WARMUP=0) still records visits but never loads anything
+def start_warmup(enabled: bool = WARMUP_ENABLED) -> WarmupScheduler:
+    return WarmupScheduler(enabled).start()
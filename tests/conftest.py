@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+from sqlalchemy.pool import StaticPool
+
+from phonepe_db import create_remote_engine
+from phonepe_schema import migrate
+
+# One in-memory SQLite database per test, shared by every connection and thread, with the full migrated schema
+@pytest.fixture
+def engine():
+    engine = create_remote_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    migrate(engine)
+    yield engine
+    engine.dispose()
+
+# Builds Map_user rows with distinct, growing values per (state, year, quarter, district)
+@pytest.fixture
+def map_user_frame():
+    def build(states: list, years: list, districts: int = 3, bump: int = 0) -> pd.DataFrame:
+        rows = []
+        for s, state in enumerate(states):
+            for year in years:
+                for quarter in range(1, 5):
+                    for d in range(districts):
+                        users = 1000 * (s + 1) + 100 * (year - years[0]) + 10 * quarter + d + bump
+                        rows.append((state, year, quarter, f"{state.lower()} district {d + 1}", users, users * 7))
+        return pd.DataFrame(rows, columns=["State", "Year", "Quarter", "users_district_name", "registeredUsers", "number_appOpens"])
+    return build
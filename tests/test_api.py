@@ -0,0 +1,66 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import phonepe_api
+from phonepe_api import create_server, slugify
+from phonepe_pages import CASE_STUDIES
+
+FILTERS = {"years": [2023, 2024], "quarters": [1, 2, 3, 4], "states": ["Goa", "Kerala"]}
+
+@pytest.fixture
+def api(monkeypatch):
+    state = {"version": "2024Q4", "loads": 0}
+
+    def load_case(case, filters, only=None):
+        state["loads"] += 1
+        return {"user_state": pd.DataFrame({"State": filters["states"], "Users": [1, 2][:len(filters["states"])]})}
+
+    monkeypatch.setattr(phonepe_api, "data_version", lambda: state["version"])
+    monkeypatch.setattr(phonepe_api, "available_filters", lambda: FILTERS)
+    monkeypatch.setattr(phonepe_api, "load_case", load_case)
+    server = create_server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+def get(url: str, etag: str | None = None) -> tuple:
+    request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as resp:
+            return resp.status, resp.headers.get("ETag"), resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("ETag"), e.read()
+
+def test_revalidation_returns_304_without_loading(api):
+    url = f"{api['url']}/v1/cases/{slugify(CASE_STUDIES[1])}/user_state?states=Goa"
+    status, tag, body = get(url)
+    assert status == 200 and tag.startswith('W/"') and b"Goa" in body
+    assert api["loads"] == 1
+
+    status, again, body = get(url, tag)
+    assert (status, again, body) == (304, tag, b"")
+    assert api["loads"] == 1
+    # Strong and listed forms of the same tag match too
+    assert get(url, f'"abc", {tag[2:]}')[0] == 304
+
+def test_new_version_or_filters_change_the_etag(api):
+    url = f"{api['url']}/v1/cases/{slugify(CASE_STUDIES[1])}/user_state"
+    _, tag, _ = get(url)
+    assert get(f"{url}?states=Kerala", tag)[0] == 200
+    assert get(f"{url}?format=arrow", tag)[0] == 200
+    api["version"] = "2025Q1"
+    status, new_tag, _ = get(url, tag)
+    assert status == 200 and new_tag != tag
+    assert api["loads"] == 4
+
+def test_unknown_filter_is_rejected_before_loading(api):
+    status, _, body = get(f"{api['url']}/v1/cases/{slugify(CASE_STUDIES[1])}?years=1999")
+    assert status == 400 and b"unknown years" in body
+    assert api["loads"] == 0
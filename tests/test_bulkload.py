@@ -0,0 +1,89 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import inspect
+
+from phonepe_bulkload import LOAD_METHODS, bulk_engine, infile_field, load_table, write_infile_csv
+from phonepe_schema import migrate
+
+# Reads a chunk file the way LOAD DATA ... FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY '' does:
+# enclosed fields are strings with doubled quotes, an unenclosed NULL is NULL, anything else is the raw text
+def read_infile(text: str) -> list:
+    rows = []
+    for line in text.split("\n")[:-1]:
+        fields, i = [], 0
+        while i <= len(line):
+            if line.startswith('"', i):
+                j, parts = i + 1, []
+                while True:
+                    k = line.index('"', j)
+                    if line.startswith('""', k):
+                        parts.append(line[j:k] + '"')
+                        j = k + 2
+                    else:
+                        parts.append(line[j:k])
+                        i = k + 1
+                        break
+                fields.append("".join(parts))
+            else:
+                k = line.find(",", i)
+                k = len(line) if k < 0 else k
+                raw = line[i:k]
+                fields.append(None if raw == "NULL" else raw)
+                i = k
+            i += 1
+        rows.append(fields)
+    return rows
+
+def test_infile_round_trip_keeps_nulls_and_literal_strings():
+    df = pd.DataFrame({
+        "State": ["Goa", None, "NULL", 'say "hi", \\N'],
+        "Year": [2020, 2021, 2022, 2023],
+        "Pincode": ["403001", np.nan, None, "\\N"],
+        "Count": [5.0, np.nan, 0.5, 12.0],
+    })
+    buf = io.StringIO()
+    write_infile_csv(df, buf)
+    rows = read_infile(buf.getvalue())
+    assert [r[0] for r in rows] == ["Goa", None, "NULL", 'say "hi", \\N']
+    assert [r[1] for r in rows] == ["2020", "2021", "2022", "2023"]
+    assert [r[2] for r in rows] == ["403001", None, None, "\\N"]
+    assert [None if r[3] is None else float(r[3]) for r in rows] == [5.0, None, 0.5, 12.0]
+
+def test_infile_field_encoding():
+    assert infile_field(None) == "NULL"
+    assert infile_field("NULL") == '"NULL"'
+    assert infile_field('a"b') == '"a""b"'
+    assert infile_field(7) == "7"
+
+def test_parallel_load_is_atomic(tmp_path, map_user_frame, monkeypatch):
+    engine = bulk_engine(f"sqlite:///{tmp_path / 'bulk.db'}", workers=3)
+    migrate(engine)
+    old = map_user_frame(["Goa"], [2022])
+    new = map_user_frame(["Goa", "Kerala", "Punjab"], [2022, 2023])
+    def read():
+        return pd.read_sql_query("SELECT * FROM Map_user ORDER BY State, Year, Quarter, users_district_name", engine)
+    m = load_table(engine, "Map_user", old, chunk_rows=5, workers=3, mode="replace")
+    assert m["chunks"] == 3 and len(read()) == len(old)
+    before = read()
+
+    # One chunk fails after the others have been written: the table and its summary keep the old rows
+    encode, write = LOAD_METHODS["multirow"]
+    def failing(conn, table, columns, records):
+        if records[0]["State"] == "Kerala":
+            raise RuntimeError("chunk failed")
+        write(conn, table, columns, records)
+    monkeypatch.setitem(LOAD_METHODS, "multirow", (encode, failing))
+    with pytest.raises(RuntimeError):
+        load_table(engine, "Map_user", new, chunk_rows=5, workers=3, mode="replace")
+    pd.testing.assert_frame_equal(read(), before)
+    assert not inspect(engine).has_table("Map_user_staging")
+
+    monkeypatch.setitem(LOAD_METHODS, "multirow", (encode, write))
+    m = load_table(engine, "Map_user", new, chunk_rows=5, workers=3, mode="replace")
+    assert m["rows"] == len(new) and len(read()) == len(new)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT SUM(registeredUsers) FROM Map_user_summary").scalar() == new["registeredUsers"].sum()
+    engine.dispose()
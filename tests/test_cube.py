@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from phonepe_cube import Cube
+
+def grouped() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    index = pd.MultiIndex.from_product([["Goa", "Kerala", "Punjab"], [2022, 2023], [1, 2, 3, 4], ["P2P", "Merchant"]],
+                                       names=["state", "year", "quarter", "type"])
+    df = index.to_frame(index=False)
+    df["count"] = rng.integers(1, 1000, len(df))
+    df["amount"] = rng.uniform(1, 1e6, len(df))
+    df["_rows"] = 1
+    # A missing group must not show up as a zero row
+    return df[~((df["state"] == "Punjab") & (df["year"] == 2023) & (df["quarter"] == 4))].reset_index(drop=True)
+
+def reference(df: pd.DataFrame, by: list, **filters) -> pd.DataFrame:
+    for dim, allowed in filters.items():
+        df = df[df[dim].isin(allowed)]
+    return df.groupby(by, as_index=False)[["count", "amount"]].sum().sort_values(by, ignore_index=True)
+
+def test_slice_matches_groupby():
+    df = grouped()
+    cube = Cube.from_frame(df, ["state", "year", "quarter", "type"], ["count", "amount"])
+    for by, filters in [(["state"], {}), (["year", "type"], {"quarter": [1, 2]}), (["state"], {"year": [2023], "state": ["Goa", "Punjab"]})]:
+        out = cube.slice(by, **filters).sort_values(by, ignore_index=True)
+        ref = reference(df, by, **filters)
+        assert out["count"].dtype == np.int64
+        pdt.assert_frame_equal(out[by + ["count", "amount"]].astype({d: ref[d].dtype for d in by}), ref, check_exact=False)
+
+def test_rollup_cuts_once_and_filters_case_insensitively():
+    df = grouped()
+    cube = Cube.from_frame(df, ["state", "year", "quarter", "type"], ["count", "amount"])
+    by_type, by_state = cube.rollup([["state", "type"], ["state"]], year=[2022], state=["goa", "KERALA"])
+    assert set(by_state["state"]) == {"Goa", "Kerala"}
+    assert by_type.groupby("state")["count"].sum().tolist() == by_state["count"].tolist()
+    assert by_state["count"].tolist() == reference(df, ["state"], year=[2022], state=["Goa", "Kerala"])["count"].tolist()
+
+def test_slice_drops_groups_without_rows():
+    cube = Cube.from_frame(grouped(), ["state", "year", "quarter", "type"], ["count", "amount"])
+    out = cube.slice(["state", "year", "quarter"], state=["Punjab"])
+    assert (2023, 4) not in set(zip(out["year"], out["quarter"]))
+    assert len(out) == 7
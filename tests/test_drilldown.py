@@ -0,0 +1,51 @@
+import pandas as pd
+from sqlalchemy import text
+
+from phonepe_drilldown import next_cursor, query_district_page
+from phonepe_ingest import upsert_partitions
+from phonepe_states import state_id
+
+COLS = {"state": "State", "year": "Year", "quarter": "Quarter", "district": "users_district_name",
+        "users": "registeredUsers", "opens": "number_appOpens"}
+
+def load(engine) -> pd.DataFrame:
+    # Seven districts over two quarters; b/c/d tie on their totals so the cursor has to break ties by name
+    users = {"a": 90, "b": 50, "c": 50, "d": 50, "e": 30, "f": 10, "g": 5}
+    rows = [("Goa", 2023, q, name, n + (q - 1), n) for name, n in users.items() for q in (1, 2)]
+    rows.append(("Kerala", 2023, 1, "a", 1000, 1))
+    df = pd.DataFrame(rows, columns=["State", "Year", "Quarter", "users_district_name", "registeredUsers", "number_appOpens"])
+    df.insert(1, "state_id", [state_id(s) for s in df["State"]])
+    upsert_partitions(engine, "Map_user", df, sorted(set(df[["State", "Year", "Quarter"]].itertuples(index=False, name=None))))
+    goa = df[df["State"] == "Goa"].groupby("users_district_name")["registeredUsers"].sum()
+    return goa.reset_index().sort_values(["registeredUsers", "users_district_name"], ascending=[False, True], ignore_index=True)
+
+def walk(engine, page_size: int, **kwargs) -> tuple:
+    pages, after, more = [], None, True
+    while more:
+        page, more = query_district_page(engine, "Map_user", COLS, [2023], [1, 2], "users", ["Goa"],
+                                         after=after, page_size=page_size, **kwargs)
+        pages.append(page)
+        after = next_cursor(page, "Users") if more else None
+    return pages, pd.concat(pages, ignore_index=True)
+
+def test_keyset_pages_cover_the_ranking_once(engine):
+    ranking = load(engine)
+    for page_size in (1, 2, 3, 7, 10):
+        pages, out = walk(engine, page_size)
+        assert all(len(p) == page_size for p in pages[:-1])
+        assert out["District"].tolist() == ranking["users_district_name"].tolist()
+        assert out["Users"].tolist() == ranking["registeredUsers"].tolist()
+
+def test_state_key_matches_spellings(engine):
+    load(engine)
+    _, by_spelling = walk(engine, 3)
+    _, by_key = walk(engine, 3, state_key=state_id("Goa"))
+    pd.testing.assert_frame_equal(by_spelling, by_key)
+
+def test_state_key_keeps_unkeyed_legacy_rows(engine):
+    ranking = load(engine)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE Map_user SET state_id = NULL WHERE State = 'Goa' AND users_district_name IN ('a', 'f')"))
+    _, out = walk(engine, 3, state_key=state_id("Goa"))
+    assert out["District"].tolist() == ranking["users_district_name"].tolist()
+    assert out["Users"].tolist() == ranking["registeredUsers"].tolist()
@@ -0,0 +1,29 @@
+import numpy as np
+
+from phonepe_geo import _douglas_peucker, simplify_geojson, subset_geojson
+
+def test_douglas_peucker_keeps_only_significant_points():
+    x = np.linspace(0, 10, 101)
+    line = np.column_stack([x, np.where(x == 5, 1.0, 0.001 * np.sin(x))])
+    out = _douglas_peucker(line, 0.01)
+    # The spike and its two neighbours survive; the 0.001 ripple does not
+    np.testing.assert_allclose(out[:, 0], [0.0, 4.9, 5.0, 5.1, 10.0])
+    assert len(_douglas_peucker(line, 0)) > len(out)
+
+def feature(name: str, ring: list) -> dict:
+    return {"type": "Feature", "properties": {"ST_NM": name}, "geometry": {"type": "Polygon", "coordinates": [ring]}}
+
+def test_simplify_keeps_shared_borders_identical():
+    # West and East share a wobbly border at x = 1, walked in opposite directions
+    border = [[1.0 + 0.002 * np.sin(i), y] for i, y in enumerate(np.linspace(0, 1, 41).tolist())]
+    left = [[0.0, 0.0]] + border + [[0.0, 1.0], [0.0, 0.0]]
+    right = border[::-1] + [[2.0, 0.0], [2.0, 1.0], border[-1]]
+    geojson = {"type": "FeatureCollection", "features": [feature("West", left), feature("East", right)]}
+    out = simplify_geojson(geojson, 0.01)
+    rings = {f["id"]: f["geometry"]["coordinates"][0] for f in out["features"]}
+    assert all(r[0] == r[-1] and len(r) >= 4 for r in rings.values())
+    assert len(rings["West"]) < len(left)
+    shared = lambda ring: {tuple(p) for p in ring if 0.5 < p[0] < 1.5}
+    assert shared(rings["West"]) == shared(rings["East"])
+    assert 2 <= len(shared(rings["West"])) < len(border)
+    assert [f["id"] for f in subset_geojson(out, ["East"])["features"]] == ["East"]
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from phonepe_cube import Cube
+from phonepe_growth import GrowthPanel, growth_table
+
+def grouped() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.MultiIndex.from_product([["Goa", "Kerala"], [2021, 2022, 2023], [1, 2, 3, 4]], names=["state", "year", "quarter"])
+    df = index.to_frame(index=False)
+    df["users"] = rng.integers(100, 10_000, len(df)).astype(float)
+    df["_rows"] = 1
+    # 2022Q3 is missing everywhere, Kerala 2023Q1 only for Kerala
+    gap = (df["year"] == 2022) & (df["quarter"] == 3)
+    return df[~gap & ~((df["state"] == "Kerala") & (df["year"] == 2023) & (df["quarter"] == 1))].reset_index(drop=True)
+
+# pandas reference on the full calendar: periods nobody reported are NaN, a state's own gap counts as zero
+def reference(df: pd.DataFrame, lag: int) -> pd.DataFrame:
+    wide = df.pivot_table(index="state", columns=["year", "quarter"], values="users", aggfunc="sum", fill_value=0)
+    calendar = pd.MultiIndex.from_product([[2021, 2022, 2023], [1, 2, 3, 4]])
+    wide = wide.reindex(columns=calendar)
+    before = wide.shift(lag, axis=1)
+    return ((wide / before.where(before > 0)) - 1) * 100
+
+def test_qoq_and_yoy_match_pandas():
+    df = grouped()
+    panel = GrowthPanel.from_cube(Cube.from_frame(df, ["state", "year", "quarter"], ["users"]), "users")
+    assert panel.periods[0] == "2021Q1" and len(panel.periods) == 12
+    assert not panel.present[1, 2]
+    np.testing.assert_allclose(panel.qoq(), reference(df, 1).to_numpy(dtype=float), equal_nan=True)
+    np.testing.assert_allclose(panel.yoy(), reference(df, 4).to_numpy(dtype=float), equal_nan=True)
+
+def test_growth_table_latest_quarter_and_cagr():
+    df = grouped()
+    panel = GrowthPanel.from_cube(Cube.from_frame(df, ["state", "year", "quarter"], ["users"]), "users")
+    out = growth_table(panel, [2021, 2022, 2023], [4], None).set_index("State")
+    users = df.set_index(["state", "year", "quarter"])["users"]
+    assert out.loc["Goa", "Latest"] == users[("Goa", 2023, 4)]
+    np.testing.assert_allclose(out.loc["Goa", "YoY_pct"], (users[("Goa", 2023, 4)] / users[("Goa", 2022, 4)] - 1) * 100)
+    np.testing.assert_allclose(out.loc["Kerala", "CAGR_pct"], ((users[("Kerala", 2023, 4)] / users[("Kerala", 2021, 4)]) ** 0.5 - 1) * 100)
+    np.testing.assert_allclose(out["Share_last_pct"].sum(), 100)
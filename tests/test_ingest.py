@@ -0,0 +1,98 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from phonepe_cube import cube_from_grouped, query_cube_frame
+from phonepe_growth import GrowthPanel
+from phonepe_ingest import ingest, ingest_incremental, state_root
+
+TABLES = ["Map_user", "Aggre_transaction"]
+STATES = ["andhra-pradesh", "goa", "kerala", "punjab"]
+YEARS = [2022, 2023]
+DISTRICTS = 3
+MAP_USER_COLS = {"state": "State", "year": "Year", "quarter": "Quarter", "users": "registeredUsers", "opens": "number_appOpens", "rows": "row_count"}
+
+def write(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"success": True, "data": data}, f)
+
+def file_path(root: str, table: str, state: str, year: int, quarter: int) -> str:
+    return os.path.join(state_root(root, table), state, str(year), f"{quarter}.json")
+
+# A small Pulse-shaped tree: every (state, year, quarter) has its own, growing values
+def write_tree(root: str):
+    for s, state in enumerate(STATES):
+        for year in YEARS:
+            for quarter in range(1, 5):
+                base = 1000 * (s + 1) + 100 * (year - YEARS[0]) + 10 * quarter
+                write(file_path(root, "Map_user", state, year, quarter), {"hoverData": {
+                    f"{state} district {d + 1}": {"registeredUsers": base + d, "appOpens": 7 * (base + d)} for d in range(DISTRICTS)
+                }})
+                write(file_path(root, "Aggre_transaction", state, year, quarter), {"transactionData": [
+                    {"name": name, "paymentInstruments": [{"type": "TOTAL", "count": base * k, "amount": base * k * 1.5}]}
+                    for k, name in enumerate(["Merchant payments", "Peer-to-peer payments"], start=1)
+                ]})
+
+def table_rows(engine, table: str) -> pd.DataFrame:
+    with engine.connect() as conn:
+        df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+def reference_rows(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype) or df[c].dtype == "string"})
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+def assert_loaded(engine, root: str):
+    for table, df in ingest(root, TABLES, workers=1).items():
+        pd.testing.assert_frame_equal(table_rows(engine, table), reference_rows(df), check_dtype=False)
+
+# Re-publishes one Map_user file with one district fewer and tripled users; returns the dropped district
+def republish(root: str, state: str, year: int, quarter: int) -> str:
+    path = file_path(root, "Map_user", state, year, quarter)
+    with open(path) as f:
+        payload = json.load(f)
+    hover = payload["data"]["hoverData"]
+    dropped = sorted(hover)[0]
+    del hover[dropped]
+    for value in hover.values():
+        value["registeredUsers"] *= 3
+    with open(path, "w") as f:
+        json.dump(payload, f)
+    return dropped
+
+def test_incremental_reingest_matches_a_full_ingest(engine, tmp_path):
+    root, manifest = str(tmp_path / "data"), str(tmp_path / "manifest.json")
+    write_tree(root)
+    first = ingest_incremental(engine, root, manifest, TABLES, workers=1)
+    assert first["Map_user"]["files"] == len(STATES) * len(YEARS) * 4
+    assert_loaded(engine, root)
+    assert ingest_incremental(engine, root, manifest, TABLES, workers=1) == {}
+
+    dropped = republish(root, "goa", 2023, 2)
+    again = ingest_incremental(engine, root, manifest, TABLES, workers=1)
+    assert again == {"Map_user": {"files": 1, "rows": DISTRICTS - 1, "partitions": 1}}
+    assert_loaded(engine, root)
+    goa = table_rows(engine, "Map_user").query("State == 'Goa' and Year == 2023 and Quarter == 2")
+    assert dropped not in set(goa["users_district_name"]) and len(goa) == DISTRICTS - 1
+
+def test_growth_from_the_summary_matches_pandas(engine, tmp_path):
+    root, manifest = str(tmp_path / "data"), str(tmp_path / "manifest.json")
+    write_tree(root)
+    ingest_incremental(engine, root, manifest, TABLES, workers=1)
+    republish(root, "goa", 2023, 2)
+    ingest_incremental(engine, root, manifest, TABLES, workers=1)
+
+    reference = ingest(root, ["Map_user"], workers=1)["Map_user"]
+    cube = cube_from_grouped("Map_user", query_cube_frame(engine, "Map_user", MAP_USER_COLS, "Map_user_summary"))
+    panel = GrowthPanel.from_cube(cube, "users")
+    wide = reference.pivot_table(index="State", columns=["Year", "Quarter"], values="registeredUsers", aggfunc="sum", observed=True)
+    # The cube keeps every canonical state; only the generated ones have rows
+    loaded = np.isin(panel.states, wide.index)
+    wide = wide.reindex(index=list(panel.states[loaded])).to_numpy(dtype=float)
+    np.testing.assert_allclose(panel.flat[loaded], wide)
+    np.testing.assert_allclose(panel.qoq()[loaded, 1:], (wide[:, 1:] / wide[:, :-1] - 1) * 100)
+    np.testing.assert_allclose(panel.yoy()[loaded, 4:], (wide[:, 4:] / wide[:, :-4] - 1) * 100)
+    assert np.isnan(panel.qoq()[~loaded]).all()
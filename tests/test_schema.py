@@ -0,0 +1,38 @@
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from phonepe_schema import FACT_TABLES, MIGRATIONS, migrate
+from phonepe_states import state_id
+
+def test_migrate_is_idempotent(engine):
+    assert migrate(engine) == []
+    insp = inspect(engine)
+    for name, table in FACT_TABLES.items():
+        assert {ix["name"] for ix in insp.get_indexes(name)} >= {ix.name for ix in table.indexes}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM schema_migrations")).scalar() == len(MIGRATIONS)
+
+def test_state_keys_are_backfilled(engine):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO Map_user (State, Year, Quarter, registeredUsers) VALUES ('Goa', 2023, 1, 5)"))
+        conn.execute(text("DELETE FROM schema_migrations WHERE version = 3"))
+    migrate(engine)
+    with engine.connect() as conn:
+        keys = pd.read_sql_query(text("SELECT State, state_id FROM Map_user"), conn)
+    assert keys["state_id"].tolist() == [state_id("Goa")]
+
+def test_legacy_spellings_are_canonicalised_and_keyed(engine):
+    rows = [("Andaman And Nicobar", 2023, 1, 5), ("Dadra And Nagar Haveli And Daman Diu", 2023, 1, 7),
+            ("andaman-&-nicobar-islands", 2023, 1, 11), ("Atlantis", 2023, 1, 13)]
+    with engine.begin() as conn:
+        for state, year, quarter, users in rows:
+            conn.execute(text("INSERT INTO Map_user (State, Year, Quarter, registeredUsers) VALUES (:s, :y, :q, :u)"),
+                         {"s": state, "y": year, "q": quarter, "u": users})
+        conn.execute(text("DELETE FROM schema_migrations WHERE version = 6"))
+    assert migrate(engine) == [6]
+    with engine.connect() as conn:
+        keys = [list(r) for r in conn.execute(text("SELECT State, state_id, SUM(registeredUsers) FROM Map_user GROUP BY State, state_id ORDER BY State"))]
+        summary = [list(r) for r in conn.execute(text("SELECT State, state_id, registeredUsers FROM Map_user_summary ORDER BY State"))]
+    andaman, dadra = "Andaman & Nicobar Islands", "Dadra & Nagar Haveli & Daman & Diu"
+    assert keys == [[andaman, state_id(andaman), 16], ["Atlantis", None, 13], [dadra, state_id(dadra), 7]]
+    assert summary == keys
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from phonepe_ingest import upsert_partitions
+from phonepe_summary import refresh_summary
+
+KEYS = ["State", "Year", "Quarter"]
+MEASURES = ["registeredUsers", "number_appOpens"]
+
+def read(engine, query: str) -> pd.DataFrame:
+    with engine.connect() as conn:
+        return pd.read_sql_query(query, conn)
+
+def expected_summary(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.groupby(KEYS, as_index=False).agg(registeredUsers=("registeredUsers", "sum"),
+                                               number_appOpens=("number_appOpens", "sum"),
+                                               row_count=("registeredUsers", "size"))
+    return out.sort_values(KEYS, ignore_index=True)
+
+def summary(engine) -> pd.DataFrame:
+    return read(engine, f"SELECT {', '.join(KEYS + MEASURES)}, row_count FROM Map_user_summary ORDER BY State, Year, Quarter")
+
+def partitions(df: pd.DataFrame) -> list:
+    return sorted(set(df[KEYS].itertuples(index=False, name=None)))
+
+def test_upsert_replaces_partitions_and_their_summary(engine, map_user_frame):
+    base = map_user_frame(["Goa", "Kerala"], [2023])
+    upsert_partitions(engine, "Map_user", base, partitions(base))
+    pd.testing.assert_frame_equal(summary(engine), expected_summary(base), check_dtype=False)
+
+    # Kerala 2023Q2 is re-published with new values and one district fewer
+    changed = map_user_frame(["Kerala"], [2023], districts=2, bump=5)
+    changed = changed[changed["Quarter"] == 2]
+    replaced = upsert_partitions(engine, "Map_user", changed, partitions(changed))
+    assert replaced == 1
+    keep = ~((base["State"] == "Kerala") & (base["Quarter"] == 2))
+    current = pd.concat([base[keep], changed], ignore_index=True)
+    rows = read(engine, "SELECT State, Year, Quarter, users_district_name, registeredUsers FROM Map_user")
+    assert len(rows) == len(current)
+    assert set(rows.itertuples(index=False, name=None)) == set(
+        current[KEYS + ["users_district_name", "registeredUsers"]].itertuples(index=False, name=None))
+    pd.testing.assert_frame_equal(summary(engine), expected_summary(current), check_dtype=False)
+
+def test_refresh_summary_partitions_leave_other_groups_alone(engine, map_user_frame):
+    df = map_user_frame(["Goa"], [2023])
+    upsert_partitions(engine, "Map_user", df, partitions(df))
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE Map_user SET registeredUsers = registeredUsers + 1")
+        refresh_summary(conn, "Map_user", [("Goa", 2023, 1)])
+    out = summary(engine).set_index("Quarter")["registeredUsers"]
+    ref = df.groupby("Quarter")["registeredUsers"].sum()
+    assert out[1] == ref[1] + 3
+    assert out[[2, 3, 4]].tolist() == ref[[2, 3, 4]].tolist()
+    with engine.begin() as conn:
+        refresh_summary(conn, "Map_user")
+    assert summary(engine)["registeredUsers"].tolist() == (ref + 3).tolist()
+
+def test_upsert_replaces_rows_stored_under_a_legacy_spelling(engine, map_user_frame):
+    legacy = map_user_frame(["Andaman And Nicobar"], [2023])
+    upsert_partitions(engine, "Map_user", legacy, partitions(legacy))
+    current = map_user_frame(["Andaman & Nicobar Islands"], [2023], bump=5)
+    upsert_partitions(engine, "Map_user", current, partitions(current))
+    rows = read(engine, "SELECT State, registeredUsers FROM Map_user")
+    assert len(rows) == len(current)
+    assert set(rows["State"]) == {"Andaman & Nicobar Islands"}
+    pd.testing.assert_frame_equal(summary(engine), expected_summary(current), check_dtype=False)